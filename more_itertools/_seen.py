@@ -0,0 +1,84 @@
+"""Bookkeeping shared by :func:`unique_everseen` and :func:`all_unique`."""
+
+# Tags that tell frozen lists and dicts apart from tuples and frozensets,
+# which don't compare equal to them.
+_FROZEN_LIST = object()
+_FROZEN_DICT = object()
+
+
+def _freeze(obj):
+    """Return a hashable version of *obj*. Two objects' frozen versions are
+    equal if and only if the objects are.
+
+    Lists, tuples, sets, dicts, and bytearrays are frozen recursively. Other
+    unhashable types (including subclasses of the above, which may redefine
+    ``==``) raise ``TypeError``. Containers that contain themselves raise
+    ``RecursionError``.
+
+    """
+    try:
+        hash(obj)
+    except TypeError:
+        pass
+    else:
+        return obj
+
+    obj_type = type(obj)
+    if obj_type is list:
+        return (_FROZEN_LIST, tuple(map(_freeze, obj)))
+    if obj_type is tuple:
+        return tuple(map(_freeze, obj))
+    if obj_type is set:
+        # Sets compare equal to frozensets, so no tag is needed
+        return frozenset(obj)
+    if obj_type is dict:
+        items = ((k, _freeze(v)) for k, v in obj.items())
+        return (_FROZEN_DICT, frozenset(items))
+    if obj_type is bytearray:
+        # Likewise, bytearrays compare equal to bytes
+        return bytes(obj)
+
+    raise TypeError('cannot freeze {!r}'.format(obj_type.__name__))
+
+
+class SeenTracker:
+    """Remember items, including unhashable ones, and report which are new.
+
+    Hashable items should be checked against and added to *seenset* directly.
+    Items that can't be hashed should go through :meth:`add_unhashable`.
+    Those that can be frozen are stored in *seenset* in their frozen form.
+    Others are kept in a list and found with a linear search. Since those
+    may compare equal to frozen items (a ``set`` subclass to a ``set``, say),
+    the two groups are checked against each other once the list is in use.
+
+    """
+
+    def __init__(self):
+        self.seenset = set()
+        self._seenlist = []
+        self._frozenlist = []
+
+    def add_unhashable(self, item):
+        """Add *item*, which couldn't be hashed, and return ``True`` if it
+        hadn't been seen before.
+        """
+        try:
+            frozen = _freeze(item)
+        except (TypeError, RecursionError):
+            # RecursionError comes from containers that contain themselves,
+            # which == can still compare.
+            pass
+        else:
+            if frozen in self.seenset:
+                return False
+            if self._seenlist and (item in self._seenlist):
+                return False
+            self.seenset.add(frozen)
+            self._frozenlist.append(item)
+            return True
+
+        seenlist = self._seenlist
+        if (item in seenlist) or (item in self._frozenlist):
+            return False
+        seenlist.append(item)
+        return True
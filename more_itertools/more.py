@@ -1,5 +1,6 @@
 import warnings
 
+from array import array
 from collections import Counter, defaultdict, deque, abc
 from collections.abc import Sequence
 from concurrent.futures import ThreadPoolExecutor
@@ -20,12 +21,19 @@ from itertools import (
     zip_longest,
 )
 from math import exp, factorial, floor, log
-from queue import Empty, Queue
+from os import cpu_count
+from queue import Empty, Full, Queue
 from random import random, randrange, uniform
-from operator import itemgetter, mul, sub, gt, lt
-from sys import hexversion, maxsize
+from operator import add, eq, iadd, itemgetter, mul, sub, gt, lt
+from pickle import HIGHEST_PROTOCOL, dump, dumps, load, loads
+from struct import pack, unpack
+from sys import hexversion, maxsize, modules
+from tempfile import TemporaryFile
+from threading import Condition, Lock, Thread
 from time import monotonic
+from weakref import WeakSet, finalize
 
+from ._seen import SeenTracker
 from .recipes import (
     consume,
     flatten,
@@ -53,6 +61,7 @@ __all__ = [
     'difference',
     'distinct_combinations',
     'distinct_permutations',
+    'distinct_substrings',
     'distribute',
     'divide',
     'exactly_n',
@@ -85,6 +94,7 @@ __all__ = [
     'peekable',
     'repeat_last',
     'replace',
+    'replayable',
     'rlocate',
     'rstrip',
     'run_length',
@@ -104,6 +114,7 @@ __all__ = [
     'strip',
     'substrings',
     'substrings_indexes',
+    'substrings_count',
     'time_limited',
     'unique_to_each',
     'unzip',
@@ -120,7 +131,7 @@ __all__ = [
 _marker = object()
 
 
-def chunked(iterable, n, strict=False):
+def chunked(iterable, n, strict=False, copy=True):
     """Break *iterable* into lists of length *n*:
 
         >>> list(chunked([1, 2, 3, 4, 5, 6], 3))
@@ -138,8 +149,17 @@ def chunked(iterable, n, strict=False):
     ``True``, then then ``ValueError`` will be raised before the last
     list is yielded.
 
+    If *copy* is ``False`` and *iterable* supports the buffer protocol
+    (e.g. ``bytes``, ``bytearray``, ``array.array``, or ``mmap``), then
+    :class:`memoryview` slices that share its memory will be yielded instead
+    of lists. See :func:`sliced` for details.
+
     """
-    iterator = iter(partial(take, n, iter(iterable)), [])
+    view = None if copy else _buffer_view(iterable)
+    if view is not None:
+        iterator = takewhile(len, (view[i : i + n] for i in count(0, n)))
+    else:
+        iterator = iter(partial(take, n, iter(iterable)), [])
     if strict:
 
         def ret():
@@ -284,11 +304,28 @@ class peekable:
         ...     list(p)
         []
 
+    peekables can be pickled, along with their cached items, if the iterator
+    they wrap can be.
+
     """
 
     def __init__(self, iterable):
         self._it = iter(iterable)
-        self._cache = deque()
+        # The cached items are self._cache[self._head:]. Items before that
+        # have already been returned; their slots are reused by prepend()
+        # and discarded from time to time by __next__().
+        self._cache = []
+        self._head = 0
+        # Incremented when cached items move, so lookahead views can tell
+        # that they're stale
+        self._version = 0
+
+    def __getstate__(self):
+        # Leave out the slots of items that have already been returned
+        state = self.__dict__.copy()
+        state['_cache'] = self._cache[self._head :]
+        state['_head'] = 0
+        return state
 
     def __iter__(self):
         return self
@@ -307,14 +344,40 @@ class peekable:
         provided, raise ``StopIteration``.
 
         """
-        if not self._cache:
+        if self._head == len(self._cache):
             try:
                 self._cache.append(next(self._it))
             except StopIteration:
                 if default is _marker:
                     raise
                 return default
-        return self._cache[0]
+        return self._cache[self._head]
+
+    def lookahead(self, n):
+        """Return a view of the next *n* items without advancing the
+        iterator. If there are fewer than *n* items left, the view will be
+        shorter:
+
+            >>> p = peekable('abcde')
+            >>> p.lookahead(3) == ('a', 'b', 'c')
+            True
+            >>> next(p)
+            'a'
+            >>> p.lookahead(10) == ('b', 'c', 'd', 'e')
+            True
+
+        Unlike ``p[:n]``, the items aren't copied. The view is only valid until
+        the peekable is next advanced or prepended to. After that, using it
+        raises ``RuntimeError``.
+
+        """
+        if n < 0:
+            raise ValueError('n must be non-negative')
+
+        if n:
+            self._fill_cache(n - 1)
+        stop = min(self._head + n, len(self._cache))
+        return _PeekableView(self, range(self._head, stop))
 
     def prepend(self, *items):
         """Stack up items to be the next ones returned from ``next()`` or
@@ -345,13 +408,49 @@ class peekable:
             StopIteration
 
         """
-        self._cache.extendleft(reversed(items))
+        size = len(items)
+        if size > self._head:
+            # Not enough room in front of the cached items. Make some, leaving
+            # space for as many again so repeated prepends stay cheap.
+            spare = size + len(self._cache) - self._head
+            self._cache[: self._head] = repeat(None, spare)
+            self._head = spare
+
+        self._cache[self._head - size : self._head] = items
+        self._head -= size
+        self._version += 1
 
     def __next__(self):
-        if self._cache:
-            return self._cache.popleft()
+        head = self._head
+        cache = self._cache
+        if head == len(cache):
+            return next(self._it)
+
+        item = cache[head]
+        cache[head] = None
+        head += 1
+        self._version += 1
+
+        # Discard the returned items once they outnumber the cached ones
+        if head == len(cache):
+            cache.clear()
+            head = 0
+        elif head > 2 * (len(cache) - head) + 16:
+            del cache[:head]
+            head = 0
+
+        self._head = head
+        return item
 
-        return next(self._it)
+    def _fill_cache(self, index):
+        # Cache enough items for index to be valid. Negative indexes need the
+        # rest of the iterable.
+        if index < 0:
+            self._cache.extend(self._it)
+        else:
+            n = self._head + index + 1 - len(self._cache)
+            if n > 0:
+                self._cache.extend(islice(self._it, n))
 
     def _get_slice(self, index):
         # Normalize the slice's arguments
@@ -367,29 +466,35 @@ class peekable:
 
         # If either the start or stop index is negative, we'll need to cache
         # the rest of the iterable in order to slice from the right side.
-        if (start < 0) or (stop < 0):
-            self._cache.extend(self._it)
         # Otherwise we'll need to find the rightmost index and cache to that
         # point.
+        if (start < 0) or (stop < 0):
+            self._fill_cache(-1)
         else:
-            n = min(max(start, stop) + 1, maxsize)
-            cache_len = len(self._cache)
-            if n >= cache_len:
-                self._cache.extend(islice(self._it, n - cache_len))
+            self._fill_cache(min(max(start, stop), maxsize - self._head - 1))
+
+        # Translate the slice to positions in the cache list
+        positions = range(self._head, len(self._cache))[index]
+        if not positions:
+            return []
+        # A reverse slice that runs to the front of the list would otherwise
+        # have a stop of -1, which counts from the end.
+        stop = positions.stop if (positions.stop >= 0) else None
 
-        return list(self._cache)[index]
+        return self._cache[positions.start : stop : positions.step]
 
     def __getitem__(self, index):
         if isinstance(index, slice):
             return self._get_slice(index)
 
-        cache_len = len(self._cache)
+        self._fill_cache(index)
+        cache_len = len(self._cache) - self._head
+        if not (-cache_len <= index < cache_len):
+            raise IndexError('peekable index out of range')
         if index < 0:
-            self._cache.extend(self._it)
-        elif index >= cache_len:
-            self._cache.extend(islice(self._it, index + 1 - cache_len))
+            index += cache_len
 
-        return self._cache[index]
+        return self._cache[self._head + index]
 
 
 def collate(*iterables, **kwargs):
@@ -733,7 +838,7 @@ def unique_to_each(*iterables):
     return [list(filter(uniques.__contains__, it)) for it in pool]
 
 
-def windowed(seq, n, fillvalue=None, step=1):
+def windowed(seq, n, fillvalue=None, step=1, copy=True):
     """Return a sliding window of width *n* over the given iterable.
 
         >>> all_windows = windowed([1, 2, 3, 4, 5], 3)
@@ -759,6 +864,20 @@ def windowed(seq, n, fillvalue=None, step=1):
         >>> padding = [None] * (n - 1)
         >>> list(windowed(chain(padding, iterable), 3))
         [(None, None, 1), (None, 1, 2), (1, 2, 3), (2, 3, 4)]
+
+    Creating a tuple for each window takes time proportional to *n*. If you
+    only need to look at each window before moving on to the next one, set
+    *copy* to ``False``. The same :class:`SequenceView` of a reused buffer is
+    then yielded for every window, and it is only valid until the next window
+    is requested:
+
+        >>> all_windows = windowed([1, 2, 3, 4, 5], 3, copy=False)
+        >>> [sum(window) for window in all_windows]
+        [6, 9, 12]
+
+    If *copy* is ``False`` and *seq* is a one-dimensional NumPy array, the
+    windows are read-only array views that share its memory instead. A padded
+    final window, if there is one, is a new array.
     """
     if n < 0:
         raise ValueError('n must be >= 0')
@@ -768,23 +887,48 @@ def windowed(seq, n, fillvalue=None, step=1):
     if step < 1:
         raise ValueError('step must be >= 1')
 
+    if (not copy) and _is_ndarray(seq) and (seq.ndim == 1):
+        yield from _windowed_ndarray(seq, n, fillvalue, step)
+        return
+
     window = deque(maxlen=n)
+    view = None if copy else SequenceView(window)
     i = n
     for _ in map(window.append, seq):
         i -= 1
         if not i:
             i = step
-            yield tuple(window)
+            yield tuple(window) if copy else view
 
     size = len(window)
     if size < n:
-        yield tuple(chain(window, repeat(fillvalue, n - size)))
+        window.extend(repeat(fillvalue, n - size))
+        yield tuple(window) if copy else view
     elif 0 < i < min(step, n):
         window += (fillvalue,) * i
-        yield tuple(window)
+        yield tuple(window) if copy else view
+
+
+def _windowed_ndarray(arr, n, fillvalue, step):
+    from numpy import concatenate, full
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    size = len(arr)
+    if size < n:
+        yield concatenate((arr, full(n - size, fillvalue)))
+        return
+
+    # The full windows are rows of a strided view of the array
+    yield from sliding_window_view(arr, n)[::step]
 
+    # Pad the window after the last full one, if it has new items
+    last_start = (size - n) // step * step
+    start = last_start + step
+    if (size > last_start + n) and (start < size):
+        yield concatenate((arr[start:], full(start + n - size, fillvalue)))
 
-def substrings(iterable):
+
+def substrings(iterable, min_len=1, max_len=None, copy=True):
     """Yield all of the substrings of *iterable*.
 
         >>> [''.join(s) for s in substrings('more')]
@@ -795,22 +939,50 @@ def substrings(iterable):
         >>> list(substrings([0, 1, 2]))
         [(0,), (1,), (2,), (0, 1), (1, 2), (0, 1, 2)]
 
+    Use *min_len* and *max_len* to restrict the lengths of the substrings.
+    Substrings with other lengths are not generated at all:
+
+        >>> [''.join(s) for s in substrings('more', min_len=2, max_len=3)]
+        ['mo', 'or', 're', 'mor', 'ore']
+
+    Each substring is a new tuple, so generating all of them takes time
+    proportional to the cube of the length of *iterable*. Set *copy* to
+    ``False`` to yield read-only views of a single copy of *iterable*
+    instead. They compare equal to tuples with the same items.
+
+    See :func:`substrings_count` to compute the number of substrings that
+    will be yielded.
+
     """
-    # The length-1 substrings
-    seq = []
-    for item in iter(iterable):
-        seq.append(item)
-        yield (item,)
-    seq = tuple(seq)
+    if min_len < 1:
+        raise ValueError('min_len must be at least 1')
+    max_len = maxsize if (max_len is None) else max_len
+
+    if copy and (min_len == 1) and (max_len >= 1):
+        # The length-1 substrings
+        seq = []
+        for item in iter(iterable):
+            seq.append(item)
+            yield (item,)
+        seq = tuple(seq)
+        min_len = 2
+    else:
+        seq = tuple(iterable)
     item_count = len(seq)
 
     # And the rest
-    for n in range(2, item_count + 1):
-        for i in range(item_count - n + 1):
-            yield seq[i : i + n]
+    lengths = range(min_len, min(max_len, item_count) + 1)
+    if copy:
+        for n in lengths:
+            for i in range(item_count - n + 1):
+                yield seq[i : i + n]
+    else:
+        for n in lengths:
+            for i in range(item_count - n + 1):
+                yield _SequenceSlice(seq, range(i, i + n))
 
 
-def substrings_indexes(seq, reverse=False):
+def substrings_indexes(seq, reverse=False, min_len=1, max_len=None, copy=True):
     """Yield all substrings and their positions in *seq*
 
     The items yielded will be a tuple of the form ``(substr, i, j)``, where
@@ -834,16 +1006,227 @@ def substrings_indexes(seq, reverse=False):
 
     Set *reverse* to ``True`` to yield the same items in the opposite order.
 
+    Use *min_len* and *max_len* to restrict the lengths of the substrings.
+    Set *copy* to ``False`` to yield read-only views of *seq* instead of
+    slices of it. If you only need the positions, this avoids copying the
+    substrings:
+
+    >>> for view, i, j in substrings_indexes('more', min_len=3, copy=False):
+    ...    print(i, j)
+    0 3
+    1 4
+    0 4
 
     """
-    r = range(1, len(seq) + 1)
+    if min_len < 1:
+        raise ValueError('min_len must be at least 1')
+    size = len(seq)
+    stop = size if (max_len is None) else min(max_len, size)
+
+    r = range(min_len, stop + 1)
     if reverse:
         r = reversed(r)
+
+    if copy:
+        return (
+            (seq[i : i + L], i, i + L) for L in r for i in range(size - L + 1)
+        )
+
     return (
-        (seq[i : i + L], i, i + L) for L in r for i in range(len(seq) - L + 1)
+        (_SequenceSlice(seq, range(i, i + L)), i, i + L)
+        for L in r
+        for i in range(size - L + 1)
     )
 
 
+def substrings_count(length, min_len=1, max_len=None):
+    """Return the number of items that :func:`substrings` and
+    :func:`substrings_indexes` yield for an iterable of *length* items.
+    *min_len* and *max_len* have the same meaning as they do for those
+    functions.
+
+        >>> substrings_count(4)
+        10
+        >>> substrings_count(100, min_len=2, max_len=5)
+        390
+
+    The count is computed directly, without generating any substrings.
+
+    """
+    if min_len < 1:
+        raise ValueError('min_len must be at least 1')
+    stop = length if (max_len is None) else min(max_len, length)
+    if stop < min_len:
+        return 0
+
+    # There are length - L + 1 substrings of each length L
+    num_lengths = stop - min_len + 1
+    return num_lengths * (length + 1) - (min_len + stop) * num_lengths // 2
+
+
+class distinct_substrings:
+    """Index the substrings of *iterable* so that each distinct one can be
+    enumerated or looked up efficiently.
+
+    Iterating over the result yields each distinct substring exactly once, as
+    a tuple:
+
+        >>> ds = distinct_substrings('abab')
+        >>> sorted(''.join(s) for s in ds)
+        ['a', 'ab', 'aba', 'abab', 'b', 'ba', 'bab']
+
+    This is equivalent to ``unique_everseen(substrings(iterable))``, except
+    the substrings are yielded in no particular order, and duplicates are
+    never generated, hashed, or stored.
+
+    Use :func:`len` to get the number of distinct substrings, which doesn't
+    require enumerating them:
+
+        >>> len(ds)
+        7
+
+    Use :meth:`count` to find the number of times a substring occurs in
+    *iterable*, and ``in`` to check whether it occurs at all:
+
+        >>> ds.count('ab')
+        2
+        >>> 'bb' in ds
+        False
+
+    The items of *iterable* must be hashable. Substrings given to
+    :meth:`count` and ``in`` may be any iterables of such items.
+
+    The index is a suffix automaton, which is built in time and space
+    proportional to the length of *iterable*. Enumerating the substrings
+    takes time proportional to their total length.
+
+    """
+
+    def __init__(self, iterable):
+        # State 0 is the initial state, which represents the empty substring.
+        # For each state, store the length of the longest substring it
+        # represents, its suffix link, its transitions, and whether it was
+        # created by cloning another state.
+        self._lens = [0]
+        self._links = [-1]
+        self._transitions = [{}]
+        self._clones = [False]
+        self._counts = None
+
+        last = 0
+        self._size = 0
+        for item in iterable:
+            last = self._extend(last, item)
+            self._size += 1
+
+    def _add_state(self, length, link, transitions, clone):
+        self._lens.append(length)
+        self._links.append(link)
+        self._transitions.append(transitions)
+        self._clones.append(clone)
+        return len(self._lens) - 1
+
+    def _extend(self, last, item):
+        lens = self._lens
+        links = self._links
+        transitions = self._transitions
+
+        cur = self._add_state(lens[last] + 1, -1, {}, False)
+        p = last
+        while (p != -1) and (item not in transitions[p]):
+            transitions[p][item] = cur
+            p = links[p]
+
+        if p == -1:
+            links[cur] = 0
+            return cur
+
+        q = transitions[p][item]
+        if lens[p] + 1 == lens[q]:
+            links[cur] = q
+            return cur
+
+        clone = self._add_state(
+            lens[p] + 1, links[q], transitions[q].copy(), True
+        )
+        while (p != -1) and (transitions[p].get(item) == q):
+            transitions[p][item] = clone
+            p = links[p]
+        links[q] = links[cur] = clone
+
+        return cur
+
+    def _find(self, substring):
+        state = 0
+        for item in substring:
+            state = self._transitions[state].get(item)
+            if state is None:
+                break
+
+        return state
+
+    def __contains__(self, substring):
+        return self._find(substring) is not None
+
+    def __iter__(self):
+        # Each path from the initial state spells out a distinct substring
+        path = []
+        stack = [iter(self._transitions[0].items())]
+        while stack:
+            for item, state in stack[-1]:
+                path.append(item)
+                yield tuple(path)
+                stack.append(iter(self._transitions[state].items()))
+                break
+            else:
+                stack.pop()
+                if stack:
+                    path.pop()
+
+    def __len__(self):
+        lens = self._lens
+        return sum(
+            lens[state] - lens[link]
+            for state, link in enumerate(self._links)
+            if state
+        )
+
+    def count(self, substring):
+        """Return the number of times *substring* occurs in the iterable.
+        Overlapping occurrences are counted separately.
+        """
+        state = self._find(substring)
+        if state is None:
+            return 0
+        if state == 0:
+            # Like str.count, find the empty substring at every position
+            return self._size + 1
+
+        if self._counts is None:
+            self._counts = self._occurrence_counts()
+
+        return self._counts[state]
+
+    def _occurrence_counts(self):
+        # Each non-clone state marks the end of one prefix. A state occurs
+        # as many times as there are prefixes ending in it or in the states
+        # whose suffix links lead to it, so propagate counts along the links
+        # starting from the longest states.
+        lens = self._lens
+        links = self._links
+        counts = [int(not clone) for clone in self._clones]
+
+        by_length = [[] for _ in range(max(lens) + 1)]
+        for state, length in enumerate(lens):
+            by_length[length].append(state)
+
+        for states in reversed(by_length[1:]):
+            for state in states:
+                counts[links[state]] += counts[state]
+
+        return counts
+
+
 class bucket:
     """Wrap *iterable* and return an object that buckets it iterable into
     child iterables based on a *key* function.
@@ -878,26 +1261,353 @@ class bucket:
         >>> list(s[2])
         []
 
+    To limit the number of cached items, supply *max_buffered*. *overflow*
+    determines what happens when another item would need to be cached:
+
+    * ``'raise'`` (the default) raises :exc:`queue.Full`. The item that
+      didn't fit is kept aside, so no items are lost: after reading from
+      other child iterables, get a new child iterable to try again.
+    * ``'drop'`` discards the oldest cached item to make room. If
+      *max_buffered* is ``0``, the new item is discarded instead.
+    * ``'spill'`` moves the cached items to temporary files on disk, where
+      they are read back one at a time as they're needed. Keys are assigned to
+      one of *shards* files by their hash, so at most that many files are
+      open at once. Items must be picklable to use this option. The files
+      are deleted when the bucket is garbage collected, or when
+      :meth:`close` is called.
+
+    Every distinct key that's read from *iterable* is remembered, so that
+    iterating over the bucket can list it. *max_buffered* doesn't limit that
+    memory, which grows with the number of distinct keys.
+
+    Call :meth:`buffered_counts` to see how many items are cached for each
+    key:
+
+        >>> iterable = ['a1', 'b1', 'c1', 'a2', 'b2', 'c2', 'b3']
+        >>> key = lambda x: x[0]
+        >>> s = bucket(iterable, key, max_buffered=2, overflow='drop')
+        >>> a_iterable = s['a']
+        >>> next(a_iterable), next(a_iterable)
+        ('a1', 'a2')
+        >>> s.buffered_counts()
+        {'b': 1, 'c': 1}
+        >>> list(s['c'])  # 'b1' is dropped to make room for 'b3'
+        ['c1', 'c2']
+        >>> list(s['b'])
+        ['b2', 'b3']
+
+    With ``'spill'``, grouping data that doesn't fit in memory takes a single
+    pass over *iterable*:
+
+        >>> key = lambda x: x % 3
+        >>> s = bucket(range(10000), key, max_buffered=100, overflow='spill')
+        >>> [sum(s[k]) for k in sorted(s)]
+        [16668333, 16661667, 16665000]
+
+    Normally the child iterables do the work of reading from *iterable* and
+    caching items for the others. To consume them from different threads,
+    set *concurrent* to ``True``. A background thread will then start reading
+    from *iterable* immediately, calling *key* once for each item, and the
+    child iterables will wait for items to arrive:
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> iterable = ['a1', 'b1', 'c1', 'a2', 'b2', 'c2', 'b3']
+        >>> s = bucket(iterable, lambda x: x[0], concurrent=True)
+        >>> with ThreadPoolExecutor() as executor:
+        ...     results = executor.map(list, [s['a'], s['b'], s['c']])
+        ...     list(results)
+        [['a1', 'a2'], ['b1', 'b2', 'b3'], ['c1', 'c2']]
+
+    In this mode *overflow* may be ``'block'`` (the default), which makes the
+    background thread wait for the child iterables to make room, or
+    ``'drop'``. Either way, an item whose key a child iterable is waiting for
+    is handed to it directly, without being cached. So with *max_buffered*
+    set to ``0``, each item is passed from the background thread to a child
+    iterable as it asks for one. Exceptions raised while reading from
+    *iterable* are re-raised by the child iterables.
+
+    With ``'block'``, the background thread waits until another item can be
+    cached or handed over. If the child iterables being read are waiting for
+    items that come after a full cache's worth of other keys, they wait until
+    those are read too.
+
+    Call :meth:`close` to stop the background thread if you don't read all
+    of *iterable*. Buckets can also be used as context managers, which close
+    them on exit:
+
+        >>> key = lambda x: x % 2
+        >>> with bucket(count(), key, max_buffered=10, concurrent=True) as s:
+        ...     list(islice(s[0], 3))
+        [0, 2, 4]
+
     """
 
-    def __init__(self, iterable, key, validator=None):
+    def __init__(
+        self,
+        iterable,
+        key,
+        validator=None,
+        max_buffered=None,
+        overflow=None,
+        concurrent=False,
+        shards=16,
+    ):
+        if (max_buffered is not None) and (max_buffered < 0):
+            raise ValueError('max_buffered must be non-negative')
+        if shards < 1:
+            raise ValueError('shards must be at least 1')
+        if overflow is None:
+            overflow = 'block' if concurrent else 'raise'
+        if concurrent:
+            policies = ('block', 'drop')
+        else:
+            policies = ('raise', 'drop', 'spill')
+        if overflow not in policies:
+            raise ValueError(
+                'overflow must be one of {}'.format(', '.join(policies))
+            )
+
         self._it = iter(iterable)
         self._key = key
-        self._cache = defaultdict(deque)
         self._validator = validator or (lambda x: True)
+        self._max_buffered = max_buffered
+        self._overflow = overflow
+
+        # The cached items for each key. Keys are removed when their items
+        # run out, but every valid key read from the iterable is kept in
+        # self._keys for __iter__.
+        self._cache = {}
+        self._keys = {}
+        self._buffered = 0
+        # The item that didn't fit when overflow='raise'
+        self._pending = None
+
+        # With overflow='drop', the key of each cached item, oldest first.
+        # Items taken from the cache leave their keys behind; those are
+        # counted in self._consumed and skipped.
+        self._order = deque()
+        self._consumed = Counter()
+        self._stale = 0
+
+        # With overflow='spill', items are moved from self._cache to the
+        # shard files. Each record has a header with the position of the
+        # next record for the same key and the size of the pickled item that
+        # follows. self._spilled has the positions of the first and last
+        # records, and the number of records, for each key. While a key has
+        # spilled items, new items for it go straight to disk so they stay
+        # in order.
+        self._shard_files = [None] * shards
+        self._close_files = []
+        self._spilled = {}
+
+        # In concurrent mode, the state above is shared with the reader
+        # thread and guarded by self._lock. Child iterables wait on the
+        # condition for their key in self._waiters; the reader thread waits
+        # on self._room for items to be taken from the cache, or for a child
+        # iterable to wait. An item for a waiting child iterable is put in
+        # self._handoffs rather than in the cache.
+        self._lock = Lock()
+        self._waiters = {}
+        self._handoffs = {}
+        self._closed = False
+        self._room = Condition(self._lock)
+        self._done = Condition(self._lock)
+        self._finished = False
+        self._error = None
+        self._concurrent = concurrent
+        if concurrent:
+            self._reader = Thread(target=self._read_all, daemon=True)
+            self._reader.start()
 
     def __contains__(self, value):
         if not self._validator(value):
             return False
 
+        if self._concurrent:
+            with self._lock:
+                self._wait_for(value)
+                return self._has_cached(value)
+
+        if self._has_cached(value):
+            return True
+
+        while True:
+            pair = self._next_pair()
+            if pair is None:
+                return False
+            self._push(*pair)
+            if pair[0] == value:
+                return True
+
+    def _next_pair(self):
+        """Return the next ``(value, item)`` pair from the parent iterator
+        with a valid value, or ``None`` if it's exhausted.
+        """
+        if self._pending is not None:
+            pair, self._pending = self._pending, None
+            return pair
+
+        for item in self._it:
+            item_value = self._key(item)
+            if self._validator(item_value):
+                self._keys[item_value] = None
+                return item_value, item
+
+        return None
+
+    def _push(self, value, item):
+        """Add *item* to the cache for *value*, applying the overflow policy
+        if the cache is full.
+        """
+        if self._is_full():
+            if self._overflow == 'raise':
+                self._pending = value, item
+                raise Full
+            elif self._overflow == 'drop':
+                if not self._drop_oldest():
+                    # Nothing is cached, so there's no room for this item
+                    return
+            else:
+                self._spill_all()
+
+        if (value in self._spilled) or self._is_full():
+            # Only possible with overflow='spill'
+            self._spill(value, (item,))
+            return
+
         try:
-            item = next(self[value])
-        except StopIteration:
-            return False
+            self._cache[value].append(item)
+        except KeyError:
+            self._cache[value] = deque([item])
+        self._buffered += 1
+
+        if self._tracks_order():
+            self._order.append(value)
+
+    def _is_full(self):
+        return (self._max_buffered is not None) and (
+            self._buffered >= self._max_buffered
+        )
+
+    def _has_cached(self, value):
+        return (
+            (value in self._cache)
+            or (value in self._spilled)
+            or (value in self._handoffs)
+        )
+
+    def _pop(self, value):
+        """Remove and return the oldest cached item for *value*."""
+        if value in self._spilled:
+            return self._unspill(value)
+
+        items = self._cache[value]
+        item = items.popleft()
+        if not items:
+            del self._cache[value]
+        self._buffered -= 1
+
+        if self._tracks_order():
+            self._consumed[value] += 1
+            self._stale += 1
+            # Don't let the skipped keys outnumber the cached items
+            if self._stale > self._buffered + 16:
+                self._compact_order()
+
+        return item
+
+    def _tracks_order(self):
+        return (self._max_buffered is not None) and (self._overflow == 'drop')
+
+    def _drop_oldest(self):
+        """Drop the oldest cached item. Return ``False`` if there are none."""
+        while self._order:
+            value = self._order.popleft()
+            if self._consumed[value]:
+                self._skip_consumed(value)
+                continue
+
+            items = self._cache[value]
+            items.popleft()
+            if not items:
+                del self._cache[value]
+            self._buffered -= 1
+            return True
+
+        return False
+
+    def _skip_consumed(self, value):
+        self._stale -= 1
+        if self._consumed[value] == 1:
+            del self._consumed[value]
         else:
-            self._cache[value].appendleft(item)
+            self._consumed[value] -= 1
 
-        return True
+    def _compact_order(self):
+        order = deque()
+        for value in self._order:
+            if self._consumed[value]:
+                self._skip_consumed(value)
+            else:
+                order.append(value)
+        self._order = order
+
+    def _spill_all(self):
+        for value, items in self._cache.items():
+            self._spill(value, items)
+        self._cache.clear()
+        self._buffered = 0
+
+    def _spill(self, value, items):
+        """Write *items* to disk after any spilled items for *value*."""
+        f = self._shard_file(value)
+        f.seek(0, 2)
+        start = offset = f.tell()
+        n = 0
+        for item in items:
+            data = dumps(item, HIGHEST_PROTOCOL)
+            last = offset
+            offset += 16 + len(data)
+            # The next record for this key follows, unless other keys' items
+            # are written first. The last record's link is updated then.
+            f.write(pack('<QQ', offset, len(data)))
+            f.write(data)
+            n += 1
+
+        run = self._spilled.get(value)
+        if run is None:
+            self._spilled[value] = [start, last, n]
+        else:
+            f.seek(run[1])
+            f.write(pack('<Q', start))
+            run[1] = last
+            run[2] += n
+
+    def _unspill(self, value):
+        f = self._shard_file(value)
+        run = self._spilled[value]
+        f.seek(run[0])
+        run[0], size = unpack('<QQ', f.read(16))
+        item = loads(f.read(size))
+
+        run[2] -= 1
+        if not run[2]:
+            del self._spilled[value]
+            if not self._spilled:
+                # Everything has been read back, so start the files over
+                for shard_file in filter(None, self._shard_files):
+                    shard_file.seek(0)
+                    shard_file.truncate()
+
+        return item
+
+    def _shard_file(self, value):
+        index = hash(value) % len(self._shard_files)
+        f = self._shard_files[index]
+        if f is None:
+            f = self._shard_files[index] = TemporaryFile()
+            self._close_files.append(finalize(self, f.close))
+        return f
 
     def _get_values(self, value):
         """
@@ -908,35 +1618,159 @@ class bucket:
         while True:
             # If we've cached some items that match the target value, emit
             # the first one and evict it from the cache.
-            if self._cache[value]:
-                yield self._cache[value].popleft()
+            if self._has_cached(value):
+                yield self._pop(value)
             # Otherwise we need to advance the parent iterator to search for
             # a matching item, caching the rest.
             else:
                 while True:
-                    try:
-                        item = next(self._it)
-                    except StopIteration:
+                    pair = self._next_pair()
+                    if pair is None:
                         return
-                    item_value = self._key(item)
+                    item_value, item = pair
                     if item_value == value:
                         yield item
                         break
-                    elif self._validator(item_value):
-                        self._cache[item_value].append(item)
+                    self._push(item_value, item)
+
+    def _read_all(self):
+        """Read the parent iterator into the cache. This runs in a background
+        thread in concurrent mode.
+        """
+        try:
+            for item in self._it:
+                item_value = self._key(item)
+                if not self._validator(item_value):
+                    continue
+
+                with self._lock:
+                    self._keys[item_value] = None
+                    while not self._closed:
+                        if self._can_hand_off(item_value):
+                            self._handoffs[item_value] = item
+                            break
+                        if (self._overflow != 'block') or not self._is_full():
+                            self._push(item_value, item)
+                            break
+                        self._room.wait()
+                    else:
+                        return
+
+                    waiter = self._waiters.get(item_value)
+                    if waiter is not None:
+                        waiter[0].notify_all()
+        except BaseException as e:
+            self._error = e
+        finally:
+            with self._lock:
+                self._finished = True
+                for condition, _ in self._waiters.values():
+                    condition.notify_all()
+                self._done.notify_all()
+
+    def _can_hand_off(self, value):
+        """Return whether a child iterable is waiting for an item for
+        *value*, and doesn't have one already. Call with self._lock held.
+        """
+        return (value in self._waiters) and not self._has_cached(value)
+
+    def _wait_for(self, value):
+        """Wait until there is a cached item for *value*, or the reader
+        thread has finished or been stopped. Call with self._lock held.
+        """
+
+        def is_ready():
+            return self._has_cached(value) or self._finished or self._closed
+
+        if is_ready():
+            return
+
+        waiter = self._waiters.get(value)
+        if waiter is None:
+            waiter = self._waiters[value] = [Condition(self._lock), 0]
+            # The reader thread may be waiting to hand over an item
+            self._room.notify()
+        waiter[1] += 1
+        try:
+            while not is_ready():
+                waiter[0].wait()
+        finally:
+            waiter[1] -= 1
+            if not waiter[1]:
+                del self._waiters[value]
+
+    def _get_values_concurrent(self, value):
+        while True:
+            with self._lock:
+                self._wait_for(value)
+                if value in self._handoffs:
+                    # Handed over items come before any cached ones
+                    item = self._handoffs.pop(value)
+                elif value in self._cache:
+                    item = self._pop(value)
+                    self._room.notify()
+                else:
+                    break
+            yield item
+
+        if self._error is not None:
+            raise self._error
 
     def __iter__(self):
-        for item in self._it:
-            item_value = self._key(item)
-            if self._validator(item_value):
-                self._cache[item_value].append(item)
+        if self._concurrent:
+            with self._lock:
+                while not (self._finished or self._closed):
+                    self._done.wait()
+            if self._error is not None:
+                raise self._error
+        else:
+            while True:
+                pair = self._next_pair()
+                if pair is None:
+                    break
+                self._push(*pair)
+
+        yield from self._keys
 
-        yield from self._cache.keys()
+    def buffered_counts(self):
+        """Return a dictionary that maps each key with cached items to the
+        number of items cached for it.
+        """
+        with self._lock:
+            ret = {value: len(items) for value, items in self._cache.items()}
+            for value, run in self._spilled.items():
+                ret[value] = ret.get(value, 0) + run[2]
+            return ret
+
+    def close(self):
+        """Delete the temporary files that are used with ``'spill'``, and
+        stop the background thread that's used in concurrent mode. Child
+        iterables that are waiting for items will stop instead. The bucket
+        can't be used after this.
+        """
+        with self._lock:
+            self._closed = True
+            self._room.notify_all()
+            self._done.notify_all()
+            for condition, _ in self._waiters.values():
+                condition.notify_all()
+
+        for close_file in self._close_files:
+            close_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def __getitem__(self, value):
         if not self._validator(value):
             return iter(())
 
+        if self._concurrent:
+            return self._get_values_concurrent(value)
+
         return self._get_values(value)
 
 
@@ -1061,7 +1895,9 @@ def collapse(iterable, base_type=None, levels=None):
     yield from walk(iterable, 0)
 
 
-def side_effect(func, iterable, chunk_size=None, before=None, after=None):
+def side_effect(
+    func, iterable, chunk_size=None, before=None, after=None, max_pending=None
+):
     """Invoke *func* on each item in *iterable* (or on each *chunk_size* group
     of items) before yielding the item.
 
@@ -1104,7 +1940,29 @@ def side_effect(func, iterable, chunk_size=None, before=None, after=None):
         >>> f.closed
         True
 
+    By default `func` is called synchronously, so a slow `func` holds up the
+    consumer. If *chunk_size* is given, you can set *max_pending* to instead
+    call `func` in a background thread, overlapping its work with the
+    consumer's:
+
+        >>> from time import sleep
+        >>> def slow_sink(chunk):
+        ...     sleep(0.01)  # e.g., a network request
+        >>> list(side_effect(slow_sink, range(6), 2, max_pending=2))
+        [0, 1, 2, 3, 4, 5]
+
+    The calls are still made one at a time, in order. Up to *max_pending*
+    chunks may be waiting for `func`; when that many are, iteration pauses
+    until the oldest one has been handled. If `func` raises an exception, it
+    is re-raised in the consumer. *after* is executed only once all pending
+    calls have completed.
+
     """
+    if max_pending is not None:
+        if chunk_size is None:
+            raise ValueError('max_pending requires chunk_size')
+        _check_max_pending(max_pending)
+
     try:
         if before is not None:
             before()
@@ -1113,16 +1971,85 @@ def side_effect(func, iterable, chunk_size=None, before=None, after=None):
             for item in iterable:
                 func(item)
                 yield item
-        else:
+        elif max_pending is None:
             for chunk in chunked(iterable, chunk_size):
                 func(chunk)
                 yield from chunk
+        else:
+            chunks = chunked(iterable, chunk_size)
+            yield from _side_effect_background(func, chunks, max_pending)
     finally:
         if after is not None:
             after()
 
 
-def sliced(seq, n, strict=False):
+def _side_effect_background(func, chunks, max_pending):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        calls = _CallQueue(executor, max_pending)
+        try:
+            for chunk in chunks:
+                # Collect calls that are done so errors surface early
+                consume(calls.collect(collect_done=True))
+                calls.submit(None, func, chunk)
+                yield from chunk
+        finally:
+            consume(calls.drain())
+
+
+def _check_max_pending(max_pending):
+    """Return *max_pending*, or its default if it's ``None``."""
+    if max_pending is None:
+        return 2 * (cpu_count() or 1)
+    if max_pending < 1:
+        raise ValueError('max_pending must be at least 1')
+
+    return max_pending
+
+
+class _CallQueue:
+    """Calls submitted to *executor*, whose results are collected in the
+    order they were submitted. At most *max_pending* calls are pending at
+    once.
+
+    Each call has a *tag*, which is returned along with its result.
+    """
+
+    def __init__(self, executor, max_pending):
+        self._executor = executor
+        self._max_pending = max_pending
+        self._pending = deque()
+
+    def collect(self, collect_done=False):
+        """Yield ``(tag, result)`` pairs for the oldest calls until there's
+        room to submit another. If *collect_done* is ``True``, old calls that
+        are already done are collected too.
+        """
+        pending = self._pending
+        while pending and (
+            (len(pending) >= self._max_pending)
+            or (collect_done and pending[0][1].done())
+        ):
+            tag, future = pending.popleft()
+            yield tag, future.result()
+
+    def submit(self, tag, fn, *args):
+        """Submit ``fn(*args)``. Call :meth:`collect` first to make room."""
+        self._pending.append((tag, self._executor.submit(fn, *args)))
+
+    def drain(self):
+        """Yield ``(tag, result)`` pairs for the remaining calls."""
+        pending = self._pending
+        while pending:
+            tag, future = pending.popleft()
+            yield tag, future.result()
+
+    def cancel(self):
+        """Cancel the remaining calls that haven't started."""
+        for tag, future in self._pending:
+            future.cancel()
+
+
+def sliced(seq, n, strict=False, copy=True):
     """Yield slices of length *n* from the sequence *seq*.
 
     >>> list(sliced((1, 2, 3, 4, 5, 6), 3))
@@ -1138,10 +2065,29 @@ def sliced(seq, n, strict=False):
     ``True``, then then ``ValueError`` will be raised before the last
     slice is yielded.
 
+    Slicing usually copies the sliced items. If *copy* is ``False`` and *seq*
+    supports the buffer protocol (e.g. ``bytes``, ``bytearray``,
+    ``array.array``, or ``mmap``), then :class:`memoryview` slices that share
+    its memory will be yielded instead:
+
+    >>> data = bytearray(b'abcdefgh')
+    >>> views = list(sliced(data, 3, copy=False))
+    >>> [bytes(v) for v in views]
+    [b'abc', b'def', b'gh']
+    >>> data[0:3] = b'ABC'
+    >>> bytes(views[0])
+    b'ABC'
+
+    While the views exist, a resizable source like ``bytearray`` can't be
+    resized. Other inputs are sliced normally, regardless of *copy*.
+
     This function will only work for iterables that support slicing.
     For non-sliceable iterables, see :func:`chunked`.
 
     """
+    view = None if copy else _buffer_view(seq)
+    if view is not None:
+        seq = view
     iterator = takewhile(len, (seq[i : i + n] for i in count(0, n)))
     if strict:
 
@@ -1156,6 +2102,26 @@ def sliced(seq, n, strict=False):
         return iterator
 
 
+def _is_ndarray(obj):
+    """Return ``True`` if *obj* is a NumPy array. NumPy is not imported; if it
+    hasn't been loaded already, *obj* can't be an array.
+    """
+    numpy = modules.get('numpy')
+    return (numpy is not None) and isinstance(obj, numpy.ndarray)
+
+
+def _buffer_view(obj):
+    """Return a one-dimensional :class:`memoryview` of *obj*, or ``None`` if
+    *obj* doesn't support the buffer protocol.
+    """
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        return None
+
+    return view if (view.ndim == 1) else None
+
+
 def split_at(iterable, pred, maxsplit=-1, keep_separator=False):
     """Yield lists of items from *iterable*, where each list is delimited by
     an item where callable *pred* returns ``True``.
@@ -1411,7 +2377,7 @@ def repeat_last(iterable, default=None):
     yield from repeat(final)
 
 
-def distribute(n, iterable):
+def distribute(n, iterable, max_buffered=None, block=True):
     """Distribute the items from *iterable* among *n* smaller iterables.
 
         >>> group_1, group_2 = distribute(2, [1, 2, 3, 4, 5, 6])
@@ -1434,18 +2400,105 @@ def distribute(n, iterable):
         >>> [list(c) for c in children]
         [[1], [2], [3], [], []]
 
-    This function uses :func:`itertools.tee` and may require significant
-    storage. If you need the order items in the smaller iterables to match the
+    If *iterable* is a sequence, the returned iterables read its items by
+    index. Otherwise, this function uses :func:`itertools.tee` and may require
+    significant storage: each item is kept until every one of the returned
+    iterables has passed it.
+
+    To limit that storage, set *max_buffered*. Each item is then handed
+    directly to the iterable it belongs to, and at most *max_buffered* items
+    will be waiting to be read from any one of them. The returned iterables
+    may then be consumed by different threads: when an item would exceed the
+    limit, the thread reading it waits until there's room. If they are all
+    consumed by one thread, that would wait forever, so set *block* to
+    ``False`` to raise :exc:`queue.Full` instead:
+
+        >>> iterable = iter([1, 2, 3, 4, 5])
+        >>> children = distribute(2, iterable, max_buffered=1, block=False)
+        >>> list(children[0])  # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+        ...
+        queue.Full
+
+    If you need the order items in the smaller iterables to match the
     original iterable, see :func:`divide`.
 
     """
     if n < 1:
         raise ValueError('n must be at least 1')
+    if (max_buffered is not None) and (max_buffered < 1):
+        raise ValueError('max_buffered must be at least 1')
+
+    if isinstance(iterable, Sequence):
+        size = len(iterable)
+        return [
+            map(iterable.__getitem__, range(index, size, n))
+            for index in range(n)
+        ]
+
+    if max_buffered is not None:
+        return _distribute_buffered(n, iterable, max_buffered, block)
 
     children = tee(iterable, n)
     return [islice(it, index, None, n) for index, it in enumerate(children)]
 
 
+def _distribute_buffered(n, iterable, max_buffered, block):
+    it = iter(iterable)
+    buffers = [deque() for _ in range(n)]
+    condition = Condition()
+    state = {'position': 0, 'exhausted': False}
+
+    def next_item(index):
+        buffer = buffers[index]
+        with condition:
+            while True:
+                if buffer:
+                    # Reading from the buffer may make room for a waiter
+                    condition.notify_all()
+                    return buffer.popleft()
+                if state['exhausted']:
+                    raise StopIteration
+
+                # Only read from the source if there is room for the item
+                target = state['position'] % n
+                if target != index and len(buffers[target]) >= max_buffered:
+                    if not block:
+                        raise Full
+                    condition.wait()
+                    continue
+
+                for item in islice(it, 1):
+                    state['position'] += 1
+                    if target == index:
+                        return item
+                    buffers[target].append(item)
+                    condition.notify_all()
+                    break
+                else:
+                    state['exhausted'] = True
+                    condition.notify_all()
+
+    return [_DistributeChild(next_item, index) for index in range(n)]
+
+
+class _DistributeChild:
+    """An iterable returned by :func:`distribute` when *max_buffered* is
+    given. Unlike a generator, it can be resumed after raising
+    :exc:`queue.Full`.
+    """
+
+    def __init__(self, next_item, index):
+        self._next_item = next_item
+        self._index = index
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._next_item(self._index)
+
+
 def stagger(iterable, offsets=(-1, 0, 1), longest=False, fillvalue=None):
     """Yield tuples whose elements are offset from *iterable*.
     The amount by which the `i`-th item in each tuple is offset is given by
@@ -1466,8 +2519,15 @@ def stagger(iterable, offsets=(-1, 0, 1), longest=False, fillvalue=None):
     By default, ``None`` will be used to replace offsets beyond the end of the
     sequence. Specify *fillvalue* to use some other value.
 
+    If *iterable* is a sequence (or a NumPy array), its items are read by
+    index. Otherwise, :func:`itertools.tee` is used to make a copy of
+    *iterable* for each offset, which may require significant storage.
+
     """
-    children = tee(iterable, len(offsets))
+    if isinstance(iterable, Sequence) or _is_ndarray(iterable):
+        children = [iterable] * len(offsets)
+    else:
+        children = tee(iterable, len(offsets))
 
     return zip_offset(
         *children, offsets=offsets, longest=longest, fillvalue=fillvalue
@@ -1559,7 +2619,11 @@ def zip_offset(*iterables, offsets, longest=False, fillvalue=None):
         if n < 0:
             staggered.append(chain(repeat(fillvalue, -n), it))
         elif n > 0:
-            staggered.append(islice(it, n, None))
+            # Sequences can skip ahead without reading the first n items
+            if isinstance(it, Sequence) or _is_ndarray(it):
+                staggered.append(map(it.__getitem__, range(n, len(it))))
+            else:
+                staggered.append(islice(it, n, None))
         else:
             staggered.append(it)
 
@@ -1827,7 +2891,14 @@ def adjacent(predicate, iterable, distance=1):
     return zip(adjacent_to_selected, i2)
 
 
-def groupby_transform(iterable, keyfunc=None, valuefunc=None, reducefunc=None):
+def groupby_transform(
+    iterable,
+    keyfunc=None,
+    valuefunc=None,
+    reducefunc=None,
+    executor=None,
+    max_pending=None,
+):
     """An extension of :func:`itertools.groupby` that can apply transformations
     to the grouped data.
 
@@ -1862,20 +2933,60 @@ def groupby_transform(iterable, keyfunc=None, valuefunc=None, reducefunc=None):
     Only adjacent items are grouped together, so if you don't want any
     duplicate groups, you should sort the iterable by the key function.
 
+    To apply an expensive *reducefunc* in parallel, pass a
+    :class:`concurrent.futures.Executor` as *executor*. Each group is then
+    stored in a list, which is passed to *reducefunc* in the executor. At most
+    *max_pending* groups are waiting in the executor at once. By default,
+    that's twice the number of CPUs. The results are yielded in the same
+    order as without *executor*:
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> iterable = [1, 1, 2, 2, 2, 3, 1]
+        >>> with ThreadPoolExecutor() as executor:
+        ...     grouper = groupby_transform(
+        ...         iterable, reducefunc=sum, executor=executor, max_pending=2
+        ...     )
+        ...     list(grouper)
+        [(1, 2), (2, 6), (3, 3), (1, 1)]
+
+    *executor* has no effect if *reducefunc* isn't given.
+
     """
+    if executor is not None:
+        max_pending = _check_max_pending(max_pending)
+
     ret = groupby(iterable, keyfunc)
     if valuefunc:
         ret = ((k, map(valuefunc, g)) for k, g in ret)
     if reducefunc:
-        ret = ((k, reducefunc(g)) for k, g in ret)
+        if executor is None:
+            ret = ((k, reducefunc(g)) for k, g in ret)
+        else:
+            ret = _groupby_transform_parallel(
+                ret, reducefunc, executor, max_pending
+            )
 
     return ret
 
 
-class numeric_range(abc.Sequence, abc.Hashable):
-    """An extension of the built-in ``range()`` function whose arguments can
-    be any orderable numeric type.
-
+def _groupby_transform_parallel(groups, reducefunc, executor, max_pending):
+    """Apply *reducefunc* to each of *groups* in *executor*, and yield the
+    keys and results in order.
+    """
+    calls = _CallQueue(executor, max_pending)
+    try:
+        for k, g in groups:
+            yield from calls.collect()
+            calls.submit(k, reducefunc, list(g))
+        yield from calls.drain()
+    finally:
+        calls.cancel()
+
+
+class numeric_range(abc.Sequence, abc.Hashable):
+    """An extension of the built-in ``range()`` function whose arguments can
+    be any orderable numeric type.
+
     With only *stop* specified, *start* defaults to ``0`` and *step*
     defaults to ``1``. The output items will match the type of *stop*:
 
@@ -2275,28 +3386,75 @@ class islice_extended:
         >>> list(it)
         ['10', '12', '14', '16', '18']
 
+    Slices without negative values can be pickled if *iterable* can be.
+
     """
 
     def __init__(self, iterable, *args):
         it = iter(iterable)
+        # Slices without negative values are kept, along with the number of
+        # items returned, so that the rest of the slice can be pickled.
+        self._source = it
+        self._slice = None
+        self._returned = 0
         if args:
-            self._iterable = _islice_helper(it, slice(*args))
+            s = slice(*args)
+            if _is_positive_slice(s):
+                self._slice = s
+                self._iterable = islice(it, s.start, s.stop, s.step)
+            else:
+                self._source = None
+                self._iterable = _islice_helper(it, s)
         else:
             self._iterable = it
 
+    def __reduce__(self):
+        if self._source is None:
+            raise TypeError(
+                'islice_extended objects with negative values cannot be '
+                'pickled'
+            )
+        if self._slice is None:
+            return self.__class__, (self._source,)
+
+        start = self._slice.start or 0
+        stop = self._slice.stop
+        step = self._slice.step or 1
+        if self._returned:
+            # The source is just past the last item that was returned
+            consumed = start + (self._returned - 1) * step + 1
+            start = step - 1
+        else:
+            consumed = 0
+        if stop is not None:
+            stop = max(stop - consumed, 0)
+        return self.__class__, (self._source, start, stop, step)
+
     def __iter__(self):
         return self
 
     def __next__(self):
-        return next(self._iterable)
+        item = next(self._iterable)
+        self._returned += 1
+        return item
 
     def __getitem__(self, key):
         if isinstance(key, slice):
-            return islice_extended(_islice_helper(self._iterable, key))
+            # Without a slice of its own, this object is just its source
+            source = self._iterable if (self._slice is None) else self
+            return islice_extended(source, key.start, key.stop, key.step)
 
         raise TypeError('islice_extended.__getitem__ argument must be a slice')
 
 
+def _is_positive_slice(s):
+    return (
+        ((s.start is None) or (s.start >= 0))
+        and ((s.stop is None) or (s.stop >= 0))
+        and ((s.step is None) or (s.step > 0))
+    )
+
+
 def _islice_helper(it, s):
     start = s.start
     stop = s.stop
@@ -2330,8 +3488,9 @@ def _islice_helper(it, s):
 
             for index, item in islice(cache, 0, n, step):
                 yield item
-        elif (stop is not None) and (stop < 0):
-            # Advance to the start position
+        else:
+            # Slices without negative values are handled by islice_extended,
+            # so stop must be negative here. Advance to the start position.
             next(islice(it, start, start), None)
 
             # When stop is negative, we have to carry -stop items while
@@ -2343,9 +3502,6 @@ def _islice_helper(it, s):
                 if index % step == 0:
                     yield cached_item
                 cache.append(item)
-        else:
-            # When both start and stop are positive we have the normal case
-            yield from islice(it, start, stop, step)
     else:
         start = -1 if (start is None) else start
 
@@ -2555,6 +3711,151 @@ class SequenceView(Sequence):
         return '{}({})'.format(self.__class__.__name__, repr(self._target))
 
 
+class _SequenceSlice(SequenceView):
+    """A read-only view of the items of the sequence *target* at the
+    positions given by the ``range`` object *indexes*. It's like
+    ``target[start:stop:step]``, but the items aren't copied.
+
+    Slicing the view returns another view. Views compare equal to tuples (and
+    each other) that have the same items.
+    """
+
+    def __init__(self, target, indexes):
+        super().__init__(target)
+        self._indexes = indexes
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _SequenceSlice(self._target, self._indexes[index])
+
+        return self._target[self._indexes[index]]
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __iter__(self):
+        return map(self._target.__getitem__, self._indexes)
+
+    def __eq__(self, other):
+        if not isinstance(other, (tuple, _SequenceSlice)):
+            return NotImplemented
+
+        return len(self) == len(other) and all(map(eq, self, other))
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, repr(tuple(self)))
+
+
+class _PeekableView(_SequenceSlice):
+    """A :class:`_SequenceSlice` of the cache of the peekable *parent*, which
+    raises ``RuntimeError`` if it's used after the cached items have moved.
+    """
+
+    def __init__(self, parent, indexes):
+        super().__init__(parent._cache, indexes)
+        self._parent = parent
+        self._version = parent._version
+
+    def _check(self):
+        if self._parent._version != self._version:
+            raise RuntimeError('peekable changed after the view was made')
+
+    def __getitem__(self, index):
+        self._check()
+        if isinstance(index, slice):
+            view = _PeekableView(self._parent, self._indexes[index])
+            view._version = self._version
+            return view
+
+        return self._target[self._indexes[index]]
+
+    def __len__(self):
+        self._check()
+        return len(self._indexes)
+
+    def __iter__(self):
+        for index in self._indexes:
+            self._check()
+            yield self._target[index]
+
+
+class _SpillCache(Sequence):
+    """An append-only sequence that keeps its last *hot_size* items in memory
+    and writes older ones to a temporary file.
+
+    Spilled items are stored as consecutive pickles. Their offsets in the file
+    are kept so each one can be read back on its own. The file is closed by
+    :meth:`close`, or when the cache is garbage collected.
+    """
+
+    def __init__(self, hot_size):
+        self._hot = deque()
+        self._hot_size = hot_size
+        self._file = None
+        self._close_file = None
+        self._offsets = array('Q')
+
+    def __getstate__(self):
+        # The file's contents are copied as they are. Loading the items
+        # instead would make the pickler keep every one of them in memory.
+        data = b''
+        if self._file is not None:
+            self._file.seek(0)
+            data = self._file.read()
+        return self._hot_size, self._hot, self._offsets, data
+
+    def __setstate__(self, state):
+        hot_size, hot, offsets, data = state
+        self.__init__(hot_size)
+        self._hot = hot
+        self._offsets = offsets
+        if data:
+            self._open().write(data)
+
+    def close(self):
+        if self._close_file is not None:
+            self._close_file()
+
+    def append(self, item):
+        self._hot.append(item)
+        if len(self._hot) > self._hot_size:
+            self._spill(self._hot.popleft())
+
+    def _open(self):
+        self._file = TemporaryFile()
+        self._close_file = finalize(self, self._file.close)
+        return self._file
+
+    def _spill(self, item):
+        if self._file is None:
+            self._open()
+        self._file.seek(0, 2)
+        self._offsets.append(self._file.tell())
+        dump(item, self._file, HIGHEST_PROTOCOL)
+
+    def _load(self, index):
+        self._file.seek(self._offsets[index])
+        return load(self._file)
+
+    def __len__(self):
+        return len(self._offsets) + len(self._hot)
+
+    def __getitem__(self, index):
+        size = len(self)
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(size))]
+
+        if index < 0:
+            index += size
+        if not (0 <= index < size):
+            raise IndexError('cache index out of range')
+
+        spilled = len(self._offsets)
+        if index < spilled:
+            return self._load(index)
+        return self._hot[index - spilled]
+
+
 class seekable:
     """Wrap an iterator to allow for seeking backward and forward. This
     progressively caches the items in the source iterable so they can be
@@ -2633,20 +3934,60 @@ class seekable:
         ('0', '1', '2', '3')
         >>> list(it.elements())
         ['2', '3']
-        >>> it.seek(0)
+        >>> it.seek(2)
         >>> next(it), next(it), next(it), next(it)
         ('2', '3', '4', '5')
-        >>> next(it)
-        '6'
+
+    Positions always count from the start of the source iterable. Seeking to
+    one that has been dropped from the cache raises ``IndexError``. Check
+    the :attr:`earliest_available` position to see how far back you can go,
+    and the current :attr:`position` to see where you are:
+
+        >>> it.earliest_available, it.position
+        (4, 6)
+        >>> it.seek(1)
+        Traceback (most recent call last):
+        ...
+        IndexError: position 1 is no longer cached; the earliest is 4
+
+    To seek back over very large iterables without holding every item in
+    memory, supply *hot_size* instead. The *hot_size* most recent items are
+    cached in memory, and older ones are pickled to a temporary file. They are
+    read back from the file as needed, so the items must be picklable:
+
+        >>> it = seekable(range(10000), hot_size=100)
+        >>> sum(it)
+        49995000
+        >>> it.seek(0)
+        >>> next(it), next(it), next(it)
+        (0, 1, 2)
+
+    The temporary file is deleted when the seekable is garbage collected. Call
+    :meth:`close` to delete it sooner, after which the seekable can no longer
+    be used.
+
+    A seekable can be pickled to save its position and cache if its source
+    iterator is picklable too. The contents of the temporary file are copied
+    into the pickle.
 
     """
 
-    def __init__(self, iterable, maxlen=None):
+    def __init__(self, iterable, maxlen=None, hot_size=None):
         self._source = iter(iterable)
-        if maxlen is None:
+        self._maxlen = maxlen
+        if (maxlen is not None) and (hot_size is not None):
+            raise ValueError('maxlen and hot_size cannot both be given')
+        elif hot_size is not None:
+            if hot_size < 0:
+                raise ValueError('hot_size must be non-negative')
+            self._cache = _SpillCache(hot_size)
+        elif maxlen is None:
             self._cache = []
         else:
             self._cache = deque([], maxlen)
+        # The absolute position of self._cache[0] in the source iterable
+        self._offset = 0
+        # The absolute position of the next item, if it's in the cache
         self._index = None
 
     def __iter__(self):
@@ -2655,7 +3996,7 @@ class seekable:
     def __next__(self):
         if self._index is not None:
             try:
-                item = self._cache[self._index]
+                item = self._cache[self._index - self._offset]
             except IndexError:
                 self._index = None
             else:
@@ -2663,6 +4004,8 @@ class seekable:
                 return item
 
         item = next(self._source)
+        if len(self._cache) == self._maxlen:
+            self._offset += 1
         self._cache.append(item)
         return item
 
@@ -2681,19 +4024,296 @@ class seekable:
                 raise
             return default
         if self._index is None:
-            self._index = len(self._cache)
+            self._index = self._offset + len(self._cache)
         self._index -= 1
         return peeked
 
+    @property
+    def position(self):
+        """The position in the source iterable of the item that will be
+        returned next.
+        """
+        if self._index is None:
+            return self._offset + len(self._cache)
+        return self._index
+
+    @property
+    def earliest_available(self):
+        """The earliest position that can still be seeked to. This is ``0``
+        unless *maxlen* was given.
+        """
+        return self._offset
+
     def elements(self):
         return SequenceView(self._cache)
 
+    def close(self):
+        """Delete the temporary file that is used if *hot_size* was given.
+        Otherwise, this does nothing.
+        """
+        if isinstance(self._cache, _SpillCache):
+            self._cache.close()
+
     def seek(self, index):
+        if index < self._offset:
+            raise IndexError(
+                'position {} is no longer cached; the earliest is {}'.format(
+                    index, self._offset
+                )
+            )
+
         self._index = index
-        remainder = index - len(self._cache)
+        remainder = index - (self._offset + len(self._cache))
         if remainder > 0:
             consume(self, remainder)
 
+    def seek_key(self, value, key=None, assume_sorted=False):
+        """Seek forward to the first item whose *key* is at least *value*.
+        If there is no such item, the iterator will be exhausted.
+
+            >>> it = seekable([3, 1, 4, 1, 5, 9, 2, 6])
+            >>> it.seek_key(5)
+            >>> next(it)
+            5
+            >>> it.seek_key(7)
+            >>> next(it)
+            9
+
+        If the items are sorted by *key*, set *assume_sorted* to ``True``.
+        The cached items are then binary searched, which is much faster than
+        scanning through them. The search covers all the items that are still
+        cached, so it may seek backward:
+
+            >>> it = seekable(range(0, 100, 5))
+            >>> it.seek(10)
+            >>> it.seek_key(32, assume_sorted=True)
+            >>> next(it)
+            35
+            >>> it.seek_key(105, assume_sorted=True)
+            >>> list(it)
+            []
+
+        """
+        getkey = (lambda x: x) if (key is None) else key
+
+        if assume_sorted:
+            cache = self._cache
+            lo = 0
+            hi = len(cache)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if getkey(cache[mid]) < value:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            self.seek(self._offset + lo)
+            if lo < len(cache):
+                return
+
+        # Scan forward from the current position
+        while True:
+            try:
+                item = self.peek()
+            except StopIteration:
+                return
+            if not (getkey(item) < value):
+                return
+            next(self)
+
+
+class replayable:
+    """Wrap an iterator so that it can be read by any number of independent
+    cursors. Call :meth:`cursor` to make a new one:
+
+        >>> r = replayable(str(n) for n in range(10))
+        >>> c_1, c_2 = r.cursor(), r.cursor()
+        >>> next(c_1), next(c_1), next(c_1)
+        ('0', '1', '2')
+        >>> next(c_2)
+        '0'
+
+    Items from the source are cached until every cursor has passed them, so
+    memory use depends on how far apart the slowest and fastest cursors are.
+    Unlike :func:`itertools.tee`, cursors can be added at any time. New
+    cursors start at the earliest item that's still cached:
+
+        >>> r.earliest_available
+        1
+        >>> c_3 = r.cursor()
+        >>> next(c_3)
+        '1'
+
+    Call a cursor's :meth:`close` method when you're done with it, so that it
+    no longer holds items in the cache:
+
+        >>> c_2.close()
+        >>> c_3.close()
+        >>> r.earliest_available
+        3
+
+    Cursors that are garbage collected are closed too, but when that happens
+    depends on the Python implementation.
+
+    Cursors can :meth:`seek` to any position that's still cached, or to
+    positions ahead of what's been read so far. Positions count from the
+    start of the source iterable. To start a new cursor at some position,
+    pass it to :meth:`cursor`:
+
+        >>> c_1.seek(5)
+        >>> next(c_1), c_1.position
+        ('5', 6)
+        >>> c_1.seek(0)
+        Traceback (most recent call last):
+        ...
+        IndexError: position 0 is no longer cached; the earliest is 3
+        >>> list(r.cursor(4))
+        ['4', '5', '6', '7', '8', '9']
+
+    Iterating over a replayable yields from a new cursor at
+    :attr:`earliest_available`, which is closed once it's exhausted.
+
+    """
+
+    def __init__(self, iterable):
+        self._it = iter(iterable)
+        # The items from position self._offset onward. Those before
+        # self._start have been passed by every cursor; their slots are
+        # cleared and removed from time to time.
+        self._cache = []
+        self._offset = 0
+        self._start = 0
+        self._cursors = WeakSet()
+        self._trimming = False
+
+    def __iter__(self):
+        cursor = self.cursor()
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    @property
+    def earliest_available(self):
+        """The earliest position a cursor can start at or seek to."""
+        return self._start
+
+    def cursor(self, position=None):
+        """Return a new cursor at *position*, which defaults to
+        :attr:`earliest_available`.
+        """
+        if position is None:
+            position = self._start
+        self._check(position)
+
+        cursor = _ReplayCursor(self, position)
+        self._cursors.add(cursor)
+        # Once the cursor is gone, the items it was holding may be released
+        finalize(cursor, self._trim)
+        return cursor
+
+    def _release(self, cursor):
+        self._cursors.discard(cursor)
+        self._trim()
+
+    def _check(self, position):
+        if position < self._start:
+            raise IndexError(
+                'position {} is no longer cached; the earliest is {}'.format(
+                    position, self._start
+                )
+            )
+
+    def _next(self, cursor):
+        position = cursor._position
+        index = position - self._offset
+        missing = index + 1 - len(self._cache)
+        if missing > 0:
+            self._cache.extend(islice(self._it, missing))
+            if index >= len(self._cache):
+                raise StopIteration
+
+        item = self._cache[index]
+        cursor._position += 1
+        if position == self._start:
+            self._trim()
+
+        return item
+
+    def _trim(self):
+        """Release the items that every cursor has passed."""
+        # Releasing items may cause a cursor to be garbage collected, which
+        # calls this method again.
+        if self._trimming:
+            return
+
+        self._trimming = True
+        try:
+            positions = [cursor._position for cursor in self._cursors]
+            if not positions:
+                return
+
+            end = self._offset + len(self._cache)
+            start = min(min(positions), end)
+            if start <= self._start:
+                return
+
+            cache = self._cache
+            for index in range(
+                self._start - self._offset, start - self._offset
+            ):
+                cache[index] = None
+            self._start = start
+
+            # Discard the released slots once they outnumber the cached items
+            dead = start - self._offset
+            if dead > end - start:
+                del cache[:dead]
+                self._offset = start
+        finally:
+            self._trimming = False
+
+
+class _ReplayCursor:
+    """An iterator over the items of a :class:`replayable`, starting at
+    *position*.
+    """
+
+    def __init__(self, parent, position):
+        self._parent = parent
+        self._position = position
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._closed:
+            raise StopIteration
+        return self._parent._next(self)
+
+    @property
+    def position(self):
+        """The position of the item that will be returned next."""
+        return self._position
+
+    def seek(self, position):
+        """Move to *position*. This raises ``IndexError`` if the item at
+        *position* is no longer cached.
+        """
+        if self._closed:
+            raise ValueError('cursor is closed')
+        self._parent._check(position)
+        self._position = position
+        self._parent._trim()
+
+    def close(self):
+        """Stop holding items in the cache. A closed cursor yields no more
+        items.
+        """
+        if not self._closed:
+            self._closed = True
+            self._parent._release(self)
+
 
 class run_length:
     """
@@ -2817,7 +4437,17 @@ def make_decorator(wrapping_func, result_index=0):
     return decorator
 
 
-def map_reduce(iterable, keyfunc, valuefunc=None, reducefunc=None):
+def map_reduce(
+    iterable,
+    keyfunc,
+    valuefunc=None,
+    reducefunc=None,
+    combiner=None,
+    executor=None,
+    chunk_size=1000,
+    max_pending=None,
+    max_keys=None,
+):
     """Return a dictionary that maps the items in *iterable* to categories
     defined by *keyfunc*, transforms them with *valuefunc*, and
     then summarizes them by category with *reducefunc*.
@@ -2863,19 +4493,130 @@ def map_reduce(iterable, keyfunc, valuefunc=None, reducefunc=None):
     Note that all items in the iterable are gathered into a list before the
     summarization step, which may require significant storage.
 
-    The returned object is a :obj:`collections.defaultdict` with the
-    ``default_factory`` set to ``None``, such that it behaves like a normal
-    dictionary.
+    To avoid that, specify a *combiner* that summarizes each category's
+    values as they arrive. It can be one of these strings, which select a
+    built-in summary: ``'sum'``, ``'count'``, ``'min'``, ``'max'``,
+    ``'mean'``, ``'first'``, or ``'last'``.
+
+        >>> keyfunc = lambda x: x % 2
+        >>> summaries = map_reduce(range(10, 21), keyfunc, combiner='mean')
+        >>> sorted(summaries.items())
+        [(0, 15.0), (1, 15.0)]
+
+    It can also be an ``(initial, combine)`` pair. Each category's summary
+    starts as *initial*, and ``combine(summary, value)`` is called to return
+    a new summary for each of its values:
+
+        >>> combiner = (0, lambda total, x: total + x * x)
+        >>> summaries = map_reduce(range(10, 21), keyfunc, combiner=combiner)
+        >>> sorted(summaries.items())
+        [(0, 1420), (1, 1165)]
+
+    If *initial* is callable, it's called with no arguments to make each
+    category's starting summary. Use a function like :class:`list` if
+    *combine* changes the summary in place, so categories don't share one:
+
+        >>> def combine(summary, x):
+        ...     summary.append(x)
+        ...     return summary
+        >>> summaries = map_reduce(range(6), keyfunc, combiner=(list, combine))
+        >>> sorted(summaries.items())
+        [(0, [0, 2, 4]), (1, [1, 3, 5])]
+
+    *reducefunc* is applied to each category's summary, if it's specified.
+
+    To spread the work over several threads or processes, pass a
+    :class:`concurrent.futures.Executor` as *executor*. *iterable* is split
+    into lists of *chunk_size* items, and each list is summarized separately
+    in the executor. The summaries are then merged in order. At most
+    *max_pending* lists are submitted to the executor at once. By default,
+    that's twice the number of CPUs.
+
+    Merging requires a third item in *combiner* pairs: a ``merge(summary_1,
+    summary_2)`` function that returns a combined summary:
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> keyfunc = lambda x: x % 2
+        >>> combiner = (0, lambda total, x: total + x * x, lambda a, b: a + b)
+        >>> with ThreadPoolExecutor() as executor:
+        ...     summaries = map_reduce(
+        ...         range(10, 21),
+        ...         keyfunc,
+        ...         combiner=combiner,
+        ...         executor=executor,
+        ...         chunk_size=3,
+        ...     )
+        >>> sorted(summaries.items())
+        [(0, 1420), (1, 1165)]
+
+    To use a :class:`concurrent.futures.ProcessPoolExecutor`, *keyfunc*,
+    *valuefunc*, *combiner*, and the items of *iterable* must be picklable.
+
+    If there are too many categories to fit in memory, set *max_keys*.
+    Chunks of *iterable* are then summarized and merged until there are more
+    than *max_keys* categories, at which point the summaries are sorted by
+    category and written to a temporary file. Once enough of these files
+    pile up, they're merged into one, so few files are open at a time. At
+    the end, the files are merged with :func:`heapq.merge`, and summaries for
+    the same category are combined. Instead of a dictionary, an iterator of
+    ``(category, summary)`` pairs sorted by category is returned:
+
+        >>> keyfunc = lambda x: x % 5
+        >>> pairs = map_reduce(
+        ...     range(20), keyfunc, combiner='sum', max_keys=2, chunk_size=3
+        ... )
+        >>> list(pairs)
+        [(0, 30), (1, 34), (2, 38), (3, 42), (4, 46)]
+
+    Like with *executor*, *combiner* pairs need a third item to merge
+    summaries. The categories must be orderable, and they must be picklable
+    along with the summaries.
+
+    Without *max_keys*, the returned object is a
+    :obj:`collections.defaultdict` with the ``default_factory`` set to
+    ``None``, such that it behaves like a normal dictionary.
 
     """
-    valuefunc = (lambda x: x) if (valuefunc is None) else valuefunc
+    external = max_keys is not None
+    if combiner is not None:
+        _check_combiner(combiner, (executor is not None) or external)
+
+    if (executor is not None) or external:
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be at least 1')
+    if executor is not None:
+        max_pending = _check_max_pending(max_pending)
+
+    if external:
+        if max_keys < 1:
+            raise ValueError('max_keys must be at least 1')
+        partials = _map_reduce_partials(
+            iterable,
+            keyfunc,
+            valuefunc,
+            combiner,
+            executor,
+            chunk_size,
+            max_pending,
+        )
+        return _map_reduce_external(partials, reducefunc, combiner, max_keys)
 
-    ret = defaultdict(list)
-    for item in iterable:
-        key = keyfunc(item)
-        value = valuefunc(item)
-        ret[key].append(value)
+    if executor is None:
+        states = _map_reduce_fold(iterable, keyfunc, valuefunc, combiner)
+    else:
+        states = {}
+        for other in _map_reduce_partials(
+            iterable,
+            keyfunc,
+            valuefunc,
+            combiner,
+            executor,
+            chunk_size,
+            max_pending,
+        ):
+            _map_reduce_merge(states, other, combiner)
 
+    ret = defaultdict(None, _map_reduce_finish(states, combiner))
     if reducefunc is not None:
         for key, value_list in ret.items():
             ret[key] = reducefunc(value_list)
@@ -2884,6 +4625,274 @@ def map_reduce(iterable, keyfunc, valuefunc=None, reducefunc=None):
     return ret
 
 
+_MAP_REDUCE_COMBINERS = ('sum', 'count', 'min', 'max', 'mean', 'first', 'last')
+
+# Functions that merge two states of each built-in combiner. None stands
+# for the lists of values that are kept when there is no combiner; those
+# lists belong to map_reduce, so they can be extended in place.
+_MAP_REDUCE_MERGES = {
+    None: iadd,
+    'sum': add,
+    'count': add,
+    'min': min,
+    'max': max,
+    'mean': lambda a, b: [a[0] + b[0], a[1] + b[1]],
+    'first': lambda a, b: a,
+    'last': lambda a, b: b,
+}
+
+
+def _check_combiner(combiner, merging):
+    if isinstance(combiner, str):
+        if combiner not in _MAP_REDUCE_COMBINERS:
+            raise ValueError(
+                'combiner must be one of {}'.format(
+                    ', '.join(_MAP_REDUCE_COMBINERS)
+                )
+            )
+    elif merging:
+        if len(combiner) != 3:
+            raise ValueError(
+                'combiner must be an (initial, combine, merge) tuple'
+            )
+    elif len(combiner) not in (2, 3):
+        raise ValueError('combiner must be an (initial, combine) pair')
+
+
+def _map_reduce_fold(iterable, keyfunc, valuefunc, combiner):
+    """Return a dictionary that maps each key in *iterable* to the state
+    of *combiner* for its values. With no *combiner*, the state is a list of
+    the values.
+    """
+    # Counting doesn't need the values at all
+    if combiner == 'count':
+        return Counter(map(keyfunc, iterable))
+
+    if valuefunc is None:
+        pairs = ((keyfunc(item), item) for item in iterable)
+    else:
+        pairs = ((keyfunc(item), valuefunc(item)) for item in iterable)
+
+    # The built-in combiners are written out to avoid a function call for
+    # each value.
+    states = {}
+    if combiner is None:
+        for key, value in pairs:
+            try:
+                states[key].append(value)
+            except KeyError:
+                states[key] = [value]
+    elif combiner == 'sum':
+        for key, value in pairs:
+            try:
+                states[key] = states[key] + value
+            except KeyError:
+                states[key] = value
+    elif combiner == 'min':
+        for key, value in pairs:
+            try:
+                if value < states[key]:
+                    states[key] = value
+            except KeyError:
+                states[key] = value
+    elif combiner == 'max':
+        for key, value in pairs:
+            try:
+                if value > states[key]:
+                    states[key] = value
+            except KeyError:
+                states[key] = value
+    elif combiner == 'mean':
+        # The state is a [total, count] list
+        for key, value in pairs:
+            try:
+                state = states[key]
+            except KeyError:
+                states[key] = [value, 1]
+            else:
+                state[0] = state[0] + value
+                state[1] += 1
+    elif combiner == 'first':
+        for key, value in pairs:
+            if key not in states:
+                states[key] = value
+    elif combiner == 'last':
+        states.update(pairs)
+    else:
+        initial, combine = combiner[:2]
+        new_state = initial if callable(initial) else (lambda: initial)
+        for key, value in pairs:
+            try:
+                state = states[key]
+            except KeyError:
+                state = new_state()
+            states[key] = combine(state, value)
+
+    return states
+
+
+def _map_reduce_merger(combiner):
+    """Return the function that merges two states for *combiner*."""
+    if (combiner is None) or isinstance(combiner, str):
+        return _MAP_REDUCE_MERGES[combiner]
+
+    return combiner[2]
+
+
+def _map_reduce_merge(states, other, combiner):
+    """Merge the states from :func:`_map_reduce_fold` for a later part of
+    the input, *other*, into *states*.
+    """
+    merge = _map_reduce_merger(combiner)
+    for key, state in other.items():
+        try:
+            current = states[key]
+        except KeyError:
+            states[key] = state
+        else:
+            states[key] = merge(current, state)
+
+
+def _map_reduce_partials(
+    iterable, keyfunc, valuefunc, combiner, executor, chunk_size, max_pending
+):
+    """Yield the states from :func:`_map_reduce_fold` for each chunk of
+    *iterable*, in order. If *executor* is given, the chunks are folded in
+    it.
+    """
+    chunks = chunked(iterable, chunk_size)
+    if executor is None:
+        for chunk in chunks:
+            yield _map_reduce_fold(chunk, keyfunc, valuefunc, combiner)
+        return
+
+    calls = _CallQueue(executor, max_pending)
+    try:
+        for chunk in chunks:
+            for _, state in calls.collect():
+                yield state
+            args = (chunk, keyfunc, valuefunc, combiner)
+            calls.submit(None, _map_reduce_fold, *args)
+        for _, state in calls.drain():
+            yield state
+    finally:
+        calls.cancel()
+
+
+def _map_reduce_finish_state(state, combiner):
+    """Convert a state from :func:`_map_reduce_fold` to its final value."""
+    if combiner == 'mean':
+        total, count = state
+        return total / count
+
+    return state
+
+
+def _map_reduce_finish(states, combiner):
+    """Convert the states from :func:`_map_reduce_fold` to final values."""
+    if combiner == 'mean':
+        return {
+            key: _map_reduce_finish_state(state, combiner)
+            for key, state in states.items()
+        }
+
+    return states
+
+
+# The number of runs of the same size that are merged into a bigger run.
+# Runs are files, so this keeps the number of open files logarithmic in the
+# number of runs.
+_MAP_REDUCE_FAN_IN = 16
+
+
+def _map_reduce_spill(pairs):
+    """Write *pairs*, which are ``(key, state)`` pairs sorted by key, to a
+    temporary file as a run and return the file.
+    """
+    f = TemporaryFile()
+    try:
+        for pair in pairs:
+            dump(pair, f, HIGHEST_PROTOCOL)
+        f.seek(0)
+    except BaseException:
+        f.close()
+        raise
+
+    return f
+
+
+def _map_reduce_read_run(f):
+    """Yield the ``(key, state)`` pairs that were written to *f* by
+    :func:`_map_reduce_spill`.
+    """
+    while True:
+        try:
+            yield load(f)
+        except EOFError:
+            return
+
+
+def _map_reduce_merge_runs(runs, merge_states, pairs=()):
+    """Yield ``(key, state)`` pairs in key order from the files in *runs*
+    and the sorted *pairs*, merging the states for each key.
+    """
+    # Runs are listed oldest first, and heapq.merge yields pairs with equal
+    # keys in the order of its arguments, so states are merged in input
+    # order.
+    merged = merge(*map(_map_reduce_read_run, runs), pairs, key=itemgetter(0))
+    for key, group in groupby(merged, key=itemgetter(0)):
+        yield key, reduce(merge_states, map(itemgetter(1), group))
+
+
+def _map_reduce_external(partials, reducefunc, combiner, max_keys):
+    """Merge *partials* while keeping at most *max_keys* keys in memory,
+    spilling sorted runs to disk as needed. Yield ``(key, value)`` pairs
+    in key order.
+    """
+    merge_states = _map_reduce_merger(combiner)
+    # Each run is a file, listed along with its level: the number of times
+    # its states have been merged from other runs.
+    runs = []
+    try:
+        states = {}
+        for other in partials:
+            _map_reduce_merge(states, other, combiner)
+            if len(states) <= max_keys:
+                continue
+
+            pairs = sorted(states.items(), key=itemgetter(0))
+            runs.append((0, _map_reduce_spill(pairs)))
+            states = {}
+
+            # Merge the newest runs once there are enough of the same level
+            while len(runs) >= _MAP_REDUCE_FAN_IN:
+                newest = runs[-_MAP_REDUCE_FAN_IN:]
+                level = newest[0][0]
+                if any(run_level != level for run_level, f in newest):
+                    break
+                files = [f for run_level, f in newest]
+                pairs = _map_reduce_merge_runs(files, merge_states)
+                run = (level + 1, _map_reduce_spill(pairs))
+                del runs[-_MAP_REDUCE_FAN_IN:]
+                runs.append(run)
+                for f in files:
+                    f.close()
+
+        pairs = _map_reduce_merge_runs(
+            [f for run_level, f in runs],
+            merge_states,
+            sorted(states.items(), key=itemgetter(0)),
+        )
+        for key, state in pairs:
+            value = _map_reduce_finish_state(state, combiner)
+            if reducefunc is not None:
+                value = reducefunc(value)
+            yield key, value
+    finally:
+        for run_level, f in runs:
+            f.close()
+
+
 def rlocate(iterable, pred=bool, window_size=None):
     """Yield the index of each item in *iterable* for which *pred* returns
     ``True``, starting from the right and moving left.
@@ -3087,6 +5096,9 @@ class time_limited:
     limit is 1 second, but it takes 2 seconds to generate the first item from
     the iterable, the function will run for 2 seconds and not yield anything.
 
+    If *iterable* can be pickled, so can the result. The time elapsed so far
+    is saved, and the clock resumes when it's unpickled.
+
     """
 
     def __init__(self, limit_seconds, iterable):
@@ -3097,6 +5109,17 @@ class time_limited:
         self._start_time = monotonic()
         self.timed_out = False
 
+    def __getstate__(self):
+        # monotonic() values aren't comparable between processes
+        state = self.__dict__.copy()
+        state['_elapsed'] = monotonic() - state.pop('_start_time')
+        return state
+
+    def __setstate__(self, state):
+        state = state.copy()
+        state['_start_time'] = monotonic() - state.pop('_elapsed')
+        self.__dict__.update(state)
+
     def __iter__(self):
         return self
 
@@ -3150,6 +5173,49 @@ def only(iterable, default=None, too_long=None):
     return first_value
 
 
+class _IChunk:
+    """A chunk yielded by :func:`ichunked`. Items are read from the shared
+    *source* on demand; they are only cached if the next chunk is requested
+    before this one has been read.
+    """
+
+    def __init__(self, source, n):
+        self._it = islice(source, n)
+        self._cache = deque()
+        self._remaining = n  # Items that may still be read from the source
+
+    def fill_cache(self):
+        self._cache.extend(self._it)
+        self._remaining = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._cache:
+            return self._cache.popleft()
+
+        try:
+            item = next(self._it)
+        except StopIteration:
+            self._remaining = 0
+            raise
+
+        self._remaining -= 1
+        return item
+
+    def __bool__(self):
+        # Chunks are always truthy, like other iterators, even when their
+        # length isn't known yet
+        return True
+
+    def __len__(self):
+        if self._remaining:
+            raise TypeError('chunk has not been read from its source yet')
+
+        return len(self._cache)
+
+
 def ichunked(iterable, n):
     """Break *iterable* into sub-iterables with *n* elements each.
     :func:`ichunked` is like :func:`chunked`, but it yields iterables
@@ -3157,8 +5223,8 @@ def ichunked(iterable, n):
 
     If the sub-iterables are read in order, the elements of *iterable*
     won't be stored in memory.
-    If they are read out of order, :func:`itertools.tee` is used to cache
-    elements as necessary.
+    If they are read out of order, the elements that were skipped over are
+    cached until they're needed.
 
     >>> from itertools import count
     >>> all_chunks = ichunked(count(), 4)
@@ -3170,21 +5236,33 @@ def ichunked(iterable, n):
     >>> list(c_3)
     [8, 9, 10, 11]
 
+    Once a chunk's elements have all been read from *iterable* - because the
+    chunk was exhausted or a later chunk was requested - calling :func:`len`
+    on it gives the number of elements it has left:
+
+    >>> all_chunks = ichunked(range(10), 4)
+    >>> c_1, c_2 = next(all_chunks), next(all_chunks)
+    >>> len(c_1)
+    4
+    >>> next(c_1)
+    0
+    >>> len(c_1)
+    3
+
     """
-    source = iter(iterable)
+    source = peekable(iter(iterable))
+    ichunk_marker = object()
 
     while True:
         # Check to see whether we're at the end of the source iterable
-        item = next(source, _marker)
-        if item is _marker:
+        if source.peek(ichunk_marker) is ichunk_marker:
             return
 
-        # Clone the source and yield an n-length slice
-        source, it = tee(chain([item], source))
-        yield islice(it, n)
-
-        # Advance the source iterable
-        consume(source, n)
+        # Yield a chunk that reads from the shared source. Before moving on,
+        # cache whatever the consumer didn't read from it.
+        chunk = _IChunk(source, n)
+        yield chunk
+        chunk.fill_cache()
 
 
 def distinct_combinations(iterable, r):
@@ -3516,7 +5594,7 @@ class callback_iter:
         yield from remaining
 
 
-def windowed_complete(iterable, n):
+def windowed_complete(iterable, n, copy=True):
     """
     Yield ``(beginning, middle, end)`` tuples, where:
 
@@ -3538,7 +5616,19 @@ def windowed_complete(iterable, n):
     *iterable*.
 
     This function will exhaust the iterable and may require significant
-    storage.
+    storage. By default each of the yielded tuples is a new copy, which
+    takes time and memory proportional to the length of *iterable* for every
+    window. Set *copy* to ``False`` to yield read-only views of a single copy
+    of *iterable* instead. The views support indexing, slicing, and
+    :func:`len`, and they compare equal to tuples with the same items:
+
+    >>> windows = windowed_complete(range(7), 3, copy=False)
+    >>> beginning, middle, end = next(windows)
+    >>> middle == (0, 1, 2)
+    True
+    >>> list(end[1:])
+    [4, 5, 6]
+
     """
     if n < 0:
         raise ValueError('n must be >= 0')
@@ -3549,6 +5639,14 @@ def windowed_complete(iterable, n):
     if n > size:
         raise ValueError('n must be <= len(seq)')
 
+    if not copy:
+        for i in range(size - n + 1):
+            beginning = _SequenceSlice(seq, range(i))
+            middle = _SequenceSlice(seq, range(i, i + n))
+            end = _SequenceSlice(seq, range(i + n, size))
+            yield beginning, middle, end
+        return
+
     for i in range(size - n + 1):
         beginning = seq[:i]
         middle = seq[i : i + n]
@@ -3573,21 +5671,21 @@ def all_unique(iterable, key=None):
 
     The function returns as soon as the first non-unique element is
     encountered. Iterables with a mix of hashable and unhashable items can
-    be used, but the function will be slower for unhashable items.
+    be used, but the function will be slower for unhashable items. See
+    :func:`unique_everseen` for details.
     """
-    seenset = set()
+    seen = SeenTracker()
+    seenset = seen.seenset
     seenset_add = seenset.add
-    seenlist = []
-    seenlist_add = seenlist.append
+    add_unhashable = seen.add_unhashable
     for element in map(key, iterable) if key else iterable:
         try:
             if element in seenset:
                 return False
             seenset_add(element)
         except TypeError:
-            if element in seenlist:
+            if not add_unhashable(element):
                 return False
-            seenlist_add(element)
     return True
 
 
@@ -1,5 +1,6 @@
 """Stubs for more_itertools.more"""
 
+from concurrent.futures import Executor
 from typing import (
     Any,
     Callable,
@@ -20,7 +21,13 @@ from typing import (
     type_check_only,
 )
 from types import TracebackType
-from typing_extensions import ContextManager, Protocol, Type, overload
+from typing_extensions import (
+    ContextManager,
+    Literal,
+    Protocol,
+    Type,
+    overload,
+)
 
 # Type and type variable definitions
 _T = TypeVar('_T')
@@ -36,10 +43,18 @@ class _SizedIterable(Protocol[_T_co], Sized, Iterable[_T_co]): ...
 @type_check_only
 class _SizedReversible(Protocol[_T_co], Sized, Reversible[_T_co]): ...
 
+@overload
 def chunked(
-    iterable: Iterable[_T], n: int, strict: bool = ...
+    iterable: Iterable[_T],
+    n: int,
+    strict: bool = ...,
+    copy: Literal[True] = ...,
 ) -> Iterator[List[_T]]: ...
 @overload
+def chunked(
+    iterable: Iterable[_T], n: int, strict: bool = ..., *, copy: bool
+) -> Iterator[Sequence[_T]]: ...
+@overload
 def first(iterable: Iterable[_T]) -> _T: ...
 @overload
 def first(iterable: Iterable[_T], default: _U) -> Union[_T, _U]: ...
@@ -62,6 +77,7 @@ class peekable(Generic[_T], Iterator[_T]):
     def peek(self) -> _T: ...
     @overload
     def peek(self, default: _U) -> Union[_T, _U]: ...
+    def lookahead(self, n: int) -> SequenceView[_T]: ...
     def prepend(self, *items: _T) -> None: ...
     def __next__(self) -> _T: ...
     @overload
@@ -90,16 +106,56 @@ def intersperse(
 def unique_to_each(*iterables: Iterable[_T]) -> List[List[_T]]: ...
 @overload
 def windowed(
-    seq: Iterable[_T], n: int, *, step: int = ...
+    seq: Iterable[_T], n: int, *, step: int = ..., copy: Literal[True] = ...
 ) -> Iterator[Tuple[Optional[_T], ...]]: ...
 @overload
 def windowed(
-    seq: Iterable[_T], n: int, fillvalue: _U, step: int = ...
+    seq: Iterable[_T], n: int, *, step: int = ..., copy: bool
+) -> Iterator[Sequence[Optional[_T]]]: ...
+@overload
+def windowed(
+    seq: Iterable[_T],
+    n: int,
+    fillvalue: _U,
+    step: int = ...,
+    copy: Literal[True] = ...,
 ) -> Iterator[Tuple[Union[_T, _U], ...]]: ...
-def substrings(iterable: Iterable[_T]) -> Iterator[Tuple[_T, ...]]: ...
+@overload
+def windowed(
+    seq: Iterable[_T], n: int, fillvalue: _U, step: int = ..., *, copy: bool
+) -> Iterator[Sequence[Union[_T, _U]]]: ...
+@overload
+def substrings(
+    iterable: Iterable[_T],
+    min_len: int = ...,
+    max_len: Optional[int] = ...,
+    copy: Literal[True] = ...,
+) -> Iterator[Tuple[_T, ...]]: ...
+@overload
+def substrings(
+    iterable: Iterable[_T],
+    min_len: int = ...,
+    max_len: Optional[int] = ...,
+    *,
+    copy: bool
+) -> Iterator[Sequence[_T]]: ...
 def substrings_indexes(
-    seq: Sequence[_T], reverse: bool = ...
+    seq: Sequence[_T],
+    reverse: bool = ...,
+    min_len: int = ...,
+    max_len: Optional[int] = ...,
+    copy: bool = ...,
 ) -> Iterator[Tuple[Sequence[_T], int, int]]: ...
+def substrings_count(
+    length: int, min_len: int = ..., max_len: Optional[int] = ...
+) -> int: ...
+
+class distinct_substrings(Generic[_T], Iterable[Tuple[_T, ...]], Sized):
+    def __init__(self, iterable: Iterable[_T]) -> None: ...
+    def __contains__(self, substring: Iterable[_T]) -> bool: ...
+    def __iter__(self) -> Iterator[Tuple[_T, ...]]: ...
+    def __len__(self) -> int: ...
+    def count(self, substring: Iterable[_T]) -> int: ...
 
 class bucket(Generic[_T, _U], Container[_U]):
     def __init__(
@@ -107,10 +163,23 @@ class bucket(Generic[_T, _U], Container[_U]):
         iterable: Iterable[_T],
         key: Callable[[_T], _U],
         validator: Optional[Callable[[object], object]] = ...,
+        max_buffered: Optional[int] = ...,
+        overflow: Optional[str] = ...,
+        concurrent: bool = ...,
+        shards: int = ...,
     ) -> None: ...
     def __contains__(self, value: object) -> bool: ...
     def __iter__(self) -> Iterator[_U]: ...
     def __getitem__(self, value: object) -> Iterator[_T]: ...
+    def buffered_counts(self) -> Dict[_U, int]: ...
+    def close(self) -> None: ...
+    def __enter__(self) -> bucket[_T, _U]: ...
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None: ...
 
 def spy(
     iterable: Iterable[_T], n: int = ...
@@ -129,6 +198,7 @@ def side_effect(
     chunk_size: None = ...,
     before: Optional[Callable[[], object]] = ...,
     after: Optional[Callable[[], object]] = ...,
+    max_pending: None = ...,
 ) -> Iterator[_T]: ...
 @overload
 def side_effect(
@@ -137,9 +207,10 @@ def side_effect(
     chunk_size: int,
     before: Optional[Callable[[], object]] = ...,
     after: Optional[Callable[[], object]] = ...,
+    max_pending: Optional[int] = ...,
 ) -> Iterator[_T]: ...
 def sliced(
-    seq: Sequence[_T], n: int, strict: bool = ...
+    seq: Sequence[_T], n: int, strict: bool = ..., copy: bool = ...
 ) -> Iterator[Sequence[_T]]: ...
 def split_at(
     iterable: Iterable[_T],
@@ -181,7 +252,12 @@ def repeat_last(iterable: Iterable[_T]) -> Iterator[_T]: ...
 def repeat_last(
     iterable: Iterable[_T], default: _U
 ) -> Iterator[Union[_T, _U]]: ...
-def distribute(n: int, iterable: Iterable[_T]) -> List[Iterator[_T]]: ...
+def distribute(
+    n: int,
+    iterable: Iterable[_T],
+    max_buffered: Optional[int] = ...,
+    block: bool = ...,
+) -> List[Iterator[_T]]: ...
 @overload
 def stagger(
     iterable: Iterable[_T],
@@ -237,6 +313,8 @@ def groupby_transform(
     keyfunc: Optional[Callable[[_T], _U]] = ...,
     valuefunc: Optional[Callable[[_T], _V]] = ...,
     reducefunc: Optional[Callable[..., _W]] = ...,
+    executor: Optional[Executor] = ...,
+    max_pending: Optional[int] = ...,
 ) -> Iterator[Tuple[_T, _W]]: ...
 
 class numeric_range(Generic[_T, _U], Sequence[_T], Hashable, Reversible[_T]):
@@ -319,7 +397,10 @@ class SequenceView(Generic[_T], Sequence[_T]):
 
 class seekable(Generic[_T], Iterator[_T]):
     def __init__(
-        self, iterable: Iterable[_T], maxlen: Optional[int] = ...
+        self,
+        iterable: Iterable[_T],
+        maxlen: Optional[int] = ...,
+        hot_size: Optional[int] = ...,
     ) -> None: ...
     def __iter__(self) -> seekable[_T]: ...
     def __next__(self) -> _T: ...
@@ -328,8 +409,35 @@ class seekable(Generic[_T], Iterator[_T]):
     def peek(self) -> _T: ...
     @overload
     def peek(self, default: _U) -> Union[_T, _U]: ...
+    @property
+    def position(self) -> int: ...
+    @property
+    def earliest_available(self) -> int: ...
     def elements(self) -> SequenceView[_T]: ...
+    def close(self) -> None: ...
     def seek(self, index: int) -> None: ...
+    def seek_key(
+        self,
+        value: Any,
+        key: Optional[Callable[[_T], Any]] = ...,
+        assume_sorted: bool = ...,
+    ) -> None: ...
+
+class replayable(Generic[_T], Iterable[_T]):
+    def __init__(self, iterable: Iterable[_T]) -> None: ...
+    def __iter__(self) -> Iterator[_T]: ...
+    @property
+    def earliest_available(self) -> int: ...
+    def cursor(self, position: Optional[int] = ...) -> _ReplayCursor[_T]: ...
+
+class _ReplayCursor(Generic[_T], Iterator[_T]):
+    def __init__(self, parent: replayable[_T], position: int) -> None: ...
+    def __iter__(self) -> _ReplayCursor[_T]: ...
+    def __next__(self) -> _T: ...
+    @property
+    def position(self) -> int: ...
+    def seek(self, position: int) -> None: ...
+    def close(self) -> None: ...
 
 class run_length:
     @staticmethod
@@ -350,6 +458,11 @@ def map_reduce(
     keyfunc: Callable[[_T], _U],
     valuefunc: None = ...,
     reducefunc: None = ...,
+    combiner: None = ...,
+    executor: Optional[Executor] = ...,
+    chunk_size: int = ...,
+    max_pending: Optional[int] = ...,
+    max_keys: None = ...,
 ) -> Dict[_U, List[_T]]: ...
 @overload
 def map_reduce(
@@ -357,6 +470,11 @@ def map_reduce(
     keyfunc: Callable[[_T], _U],
     valuefunc: Callable[[_T], _V],
     reducefunc: None = ...,
+    combiner: None = ...,
+    executor: Optional[Executor] = ...,
+    chunk_size: int = ...,
+    max_pending: Optional[int] = ...,
+    max_keys: None = ...,
 ) -> Dict[_U, List[_V]]: ...
 @overload
 def map_reduce(
@@ -364,6 +482,11 @@ def map_reduce(
     keyfunc: Callable[[_T], _U],
     valuefunc: None = ...,
     reducefunc: Callable[[List[_T]], _W] = ...,
+    combiner: None = ...,
+    executor: Optional[Executor] = ...,
+    chunk_size: int = ...,
+    max_pending: Optional[int] = ...,
+    max_keys: None = ...,
 ) -> Dict[_U, _W]: ...
 @overload
 def map_reduce(
@@ -371,7 +494,38 @@ def map_reduce(
     keyfunc: Callable[[_T], _U],
     valuefunc: Callable[[_T], _V],
     reducefunc: Callable[[List[_V]], _W],
+    combiner: None = ...,
+    executor: Optional[Executor] = ...,
+    chunk_size: int = ...,
+    max_pending: Optional[int] = ...,
+    max_keys: None = ...,
 ) -> Dict[_U, _W]: ...
+@overload
+def map_reduce(
+    iterable: Iterable[_T],
+    keyfunc: Callable[[_T], _U],
+    valuefunc: Optional[Callable[[_T], Any]] = ...,
+    reducefunc: Optional[Callable[[Any], Any]] = ...,
+    *,
+    combiner: Union[str, Tuple[Any, ...]],
+    executor: Optional[Executor] = ...,
+    chunk_size: int = ...,
+    max_pending: Optional[int] = ...,
+    max_keys: None = ...,
+) -> Dict[_U, Any]: ...
+@overload
+def map_reduce(
+    iterable: Iterable[_T],
+    keyfunc: Callable[[_T], _U],
+    valuefunc: Optional[Callable[[_T], Any]] = ...,
+    reducefunc: Optional[Callable[[Any], Any]] = ...,
+    combiner: Union[str, Tuple[Any, ...], None] = ...,
+    executor: Optional[Executor] = ...,
+    chunk_size: int = ...,
+    max_pending: Optional[int] = ...,
+    *,
+    max_keys: int,
+) -> Iterator[Tuple[_U, Any]]: ...
 def rlocate(
     iterable: Iterable[_T],
     pred: Callable[..., object] = ...,
@@ -454,9 +608,14 @@ class callback_iter(Generic[_T], Iterator[_T]):
     @property
     def result(self) -> Any: ...
 
+@overload
 def windowed_complete(
-    iterable: Iterable[_T], n: int
-) -> Iterator[Tuple[_T, ...]]: ...
+    iterable: Iterable[_T], n: int, copy: Literal[True] = ...
+) -> Iterator[Tuple[Tuple[_T, ...], Tuple[_T, ...], Tuple[_T, ...]]]: ...
+@overload
+def windowed_complete(
+    iterable: Iterable[_T], n: int, *, copy: bool
+) -> Iterator[Tuple[Sequence[_T], Sequence[_T], Sequence[_T]]]: ...
 def all_unique(
     iterable: Iterable[_T], key: Optional[Callable[[_T], _U]] = ...
 ) -> bool: ...
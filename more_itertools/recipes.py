@@ -24,6 +24,8 @@ from itertools import (
 import operator
 from random import randrange, sample, choice
 
+from ._seen import SeenTracker
+
 __all__ = [
     'all_equal',
     'consume',
@@ -369,28 +371,23 @@ def unique_everseen(iterable, key=None):
         ['A', 'B', 'C', 'D']
 
     Sequences with a mix of hashable and unhashable items can be used.
-    The function will be slower (i.e., `O(n^2)`) for unhashable items.
-
-    Remember that ``list`` objects are unhashable - you can use the *key*
-    parameter to transform the list to a tuple (which is hashable) to
-    avoid a slowdown.
+    Unhashable ``list``, ``tuple``, ``set``, ``dict``, and ``bytearray``
+    objects are converted to hashable equivalents, so they're handled quickly:
 
-        >>> iterable = ([1, 2], [2, 3], [1, 2])
-        >>> list(unique_everseen(iterable))  # Slow
-        [[1, 2], [2, 3]]
-        >>> list(unique_everseen(iterable, key=tuple))  # Faster
-        [[1, 2], [2, 3]]
+        >>> iterable = ([1, 2], {'a': [3]}, [1, 2], {'a': [3]})
+        >>> list(unique_everseen(iterable))
+        [[1, 2], {'a': [3]}]
 
-    Similary, you may want to convert unhashable ``set`` objects with
-    ``key=frozenset``. For ``dict`` objects,
-    ``key=lambda x: frozenset(x.items())`` can be used.
+    Other unhashable items (including subclasses of those types) are
+    compared one at a time, so the function becomes `O(n^2)`. To avoid that,
+    use the *key* parameter to transform items to hashable ones.
 
     """
     key = key if key is not None else lambda x: x
-    seenset = set()
+    seen = SeenTracker()
+    seenset = seen.seenset
     seenset_add = seenset.add
-    seenlist = []
-    seenlist_add = seenlist.append
+    add_unhashable = seen.add_unhashable
     for element in iterable:
         k = key(element)
         try:
@@ -398,8 +395,7 @@ def unique_everseen(iterable, key=None):
                 seenset_add(k)
                 yield element
         except TypeError:
-            if k not in seenlist:
-                seenlist_add(k)
+            if add_unhashable(k):
                 yield element
 
 
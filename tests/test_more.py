@@ -1,5 +1,12 @@
+from array import array
 from collections import Counter, abc
 from collections.abc import Set
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from datetime import datetime, timedelta
 from decimal import Decimal
 from doctest import DocTestSuite
@@ -19,16 +26,30 @@ from itertools import (
     repeat,
 )
 from operator import add, mul, itemgetter
+from os.path import dirname
 from pickle import loads, dumps
-from random import seed
+from queue import Full
+from random import choice, randrange, seed
 from statistics import mean
-from sys import version_info
+from subprocess import check_output
+from sys import executable, version_info
+from threading import current_thread, Event, Thread
 from time import sleep
 from traceback import format_exc
 from unittest import skipIf, TestCase
 
 import more_itertools as mi
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
 
 def load_tests(loader, tests, ignore):
     # Add the doctests
@@ -124,6 +145,25 @@ class ChunkedTests(TestCase):
             [['A', 'B', 'C'], ['D', 'E', 'F']],
         )
 
+    def test_no_copy(self):
+        data = bytearray(b'ABCDEFG')
+        actual = list(mi.chunked(data, 3, copy=False))
+        self.assertTrue(all(isinstance(c, memoryview) for c in actual))
+        self.assertEqual([c.tobytes() for c in actual], [b'ABC', b'DEF', b'G'])
+
+        # The chunks share memory with the source
+        data[0] = ord('a')
+        self.assertEqual(actual[0].tobytes(), b'aBC')
+
+    def test_no_copy_strict(self):
+        with self.assertRaisesRegex(ValueError, "iterable is not divisible"):
+            list(mi.chunked(b'ABCDEFG', 3, strict=True, copy=False))
+
+    def test_no_copy_not_buffer(self):
+        # Inputs that don't support the buffer protocol are chunked normally
+        actual = list(mi.chunked('ABCDE', 3, copy=False))
+        self.assertEqual(actual, [['A', 'B', 'C'], ['D', 'E']])
+
 
 class FirstTests(TestCase):
     def test_many(self):
@@ -335,6 +375,19 @@ class PeekableTests(PeekableMixinTests, TestCase):
             expected = iterable[1:][index]
             self.assertEqual(actual, expected, slice_args)
 
+    def test_slicing_out_of_range(self):
+        """Test slices that start or stop outside the items, with nothing
+        consumed"""
+        iterable = ['0', '1', '2', '3', '4']
+        indexes = [-20, -6, -5, -1, 0, 4, 5, 20, None]
+        steps = [1, 2, -1, -2]
+        for slice_args in product(indexes, indexes, steps):
+            p = mi.peekable(iter(iterable))
+            index = slice(*slice_args)
+            actual = p[index]
+            expected = iterable[index]
+            self.assertEqual(actual, expected, slice_args)
+
     def test_slicing_error(self):
         iterable = '01234567'
         p = mi.peekable(iter(iterable))
@@ -351,6 +404,91 @@ class PeekableTests(PeekableMixinTests, TestCase):
         self.assertEqual(old_cache, list(p._cache))
         self.assertEqual(list(p), list(iterable))
 
+    def test_mixed_operations(self):
+        # Check indexing and slicing against a list while the cache is
+        # advanced, compacted and prepended to.
+        seed(0)
+        p = mi.peekable(range(500))
+        remaining = list(range(500))
+        for i in range(2000):
+            op = randrange(4)
+            if op == 0 and remaining:
+                self.assertEqual(next(p), remaining.pop(0))
+            elif op == 1:
+                items = [-i] * randrange(5)
+                p.prepend(*items)
+                remaining[:0] = items
+            elif op == 2 and remaining:
+                index = randrange(-len(remaining), len(remaining))
+                self.assertEqual(p[index], remaining[index])
+            else:
+                start, stop = randrange(-10, 10), randrange(-10, 10)
+                step = choice([-2, -1, 1, 3])
+                self.assertEqual(
+                    p[start:stop:step], remaining[start:stop:step]
+                )
+
+        self.assertEqual(list(p), remaining)
+
+    def test_lookahead(self):
+        p = mi.peekable(iter(range(10)))
+        self.assertEqual(p.lookahead(0), ())
+        self.assertEqual(p.lookahead(3), (0, 1, 2))
+        self.assertEqual(next(p), 0)
+
+        view = p.lookahead(4)
+        self.assertEqual(view, (1, 2, 3, 4))
+        self.assertEqual(view[1:3], (2, 3))
+        self.assertEqual(view[-1], 4)
+        self.assertIs(view._target, p._cache)  # Not copied
+
+        p.prepend('a')
+        self.assertEqual(p.lookahead(2), ('a', 1))
+        self.assertEqual(mi.take(4, p), ['a', 1, 2, 3])
+        self.assertEqual(p.lookahead(100), tuple(range(4, 10)))
+        mi.consume(p)
+        self.assertEqual(p.lookahead(2), ())
+        self.assertRaises(ValueError, lambda: p.lookahead(-1))
+
+    def test_lookahead_stale(self):
+        p = mi.peekable(iter(range(10)))
+        view = p.lookahead(3)
+        sub_view = view[1:]
+        iterator = iter(view)
+        self.assertEqual(next(iterator), 0)
+        p.peek()  # Peeking doesn't move the cached items
+        self.assertEqual(view, (0, 1, 2))
+
+        next(p)
+        for func in (len, list, lambda v: v[0], lambda v: v[:1]):
+            with self.assertRaises(RuntimeError):
+                func(view)
+        self.assertRaises(RuntimeError, lambda: sub_view[0])
+        self.assertRaises(RuntimeError, lambda: next(iterator))
+
+        view = p.lookahead(2)
+        p.prepend('a')
+        self.assertRaises(RuntimeError, lambda: view == (1, 2))
+
+    def test_index_error(self):
+        p = mi.peekable(range(3))
+        next(p)
+        for index in (2, -3):
+            with self.assertRaises(IndexError):
+                p[index]
+        self.assertEqual(p[-2], 1)
+
+    def test_pickle(self):
+        p = mi.peekable(iter(range(100)))
+        mi.consume(p, 40)
+        p.prepend('a', 'b')
+        self.assertEqual(p[10], 48)
+
+        restored = loads(dumps(p))
+        self.assertEqual(len(restored._cache), 11)
+        self.assertEqual(list(restored), ['a', 'b'] + list(range(40, 100)))
+        self.assertEqual(list(p), ['a', 'b'] + list(range(40, 100)))
+
     # prepend() behavior tests
 
     def test_prepend(self):
@@ -764,6 +902,69 @@ class WindowedTests(TestCase):
         with self.assertRaises(ValueError):
             list(mi.windowed(iterable, 3, step=0))
 
+    def test_no_copy(self):
+        for size, n, step in product(range(8), range(1, 5), range(1, 6)):
+            with self.subTest(size=size, n=n, step=step):
+                windows = mi.windowed(range(size), n, 0, step, copy=False)
+                actual = [list(w) for w in windows]
+                expected = [
+                    list(w) for w in mi.windowed(range(size), n, 0, step)
+                ]
+                self.assertEqual(actual, expected)
+
+    def test_no_copy_reused(self):
+        windows = mi.windowed('abcde', 3, copy=False)
+        first = next(windows)
+        self.assertIsInstance(first, mi.SequenceView)
+        self.assertEqual((len(first), first[0], first[-1]), (3, 'a', 'c'))
+
+        # The same view is updated in place for the next window
+        second = next(windows)
+        self.assertIs(first, second)
+        self.assertEqual(list(second), ['b', 'c', 'd'])
+
+        # Views can't be modified
+        with self.assertRaises(TypeError):
+            second[0] = 'z'
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_ndarray_views(self):
+        arr = numpy.arange(6)
+        actual = list(mi.windowed(arr, 3, copy=False))
+        self.assertEqual(
+            [w.tolist() for w in actual],
+            [[0, 1, 2], [1, 2, 3], [2, 3, 4], [3, 4, 5]],
+        )
+        for window in actual:
+            self.assertTrue(numpy.shares_memory(window, arr))
+            self.assertFalse(window.flags.writeable)
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_ndarray_matches_tuples(self):
+        for size, n, step in product(range(8), range(1, 5), range(1, 6)):
+            with self.subTest(size=size, n=n, step=step):
+                arr = numpy.arange(size)
+                actual = [
+                    w.tolist()
+                    for w in mi.windowed(
+                        arr, n, fillvalue=-1, step=step, copy=False
+                    )
+                ]
+                expected = [
+                    list(w)
+                    for w in mi.windowed(
+                        range(size), n, fillvalue=-1, step=step
+                    )
+                ]
+                self.assertEqual(actual, expected)
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_ndarray_copy(self):
+        # By default, arrays are windowed like any other iterable
+        actual = list(mi.windowed(numpy.arange(4), 3))
+        self.assertEqual(actual, [(0, 1, 2), (1, 2, 3)])
+        self.assertIsInstance(actual[0], tuple)
+
 
 class SubstringsTests(TestCase):
     def test_basic(self):
@@ -808,6 +1009,37 @@ class SubstringsTests(TestCase):
         expected = [(2,), (0,), (1,), (2, 0), (0, 1), (2, 0, 1)]
         self.assertEqual(actual, expected)
 
+    def test_lengths(self):
+        for min_len, max_len, expected in [
+            (2, 3, ['ab', 'bc', 'cd', 'abc', 'bcd']),
+            (3, None, ['abc', 'bcd', 'abcd']),
+            (1, 1, ['a', 'b', 'c', 'd']),
+            (1, 0, []),
+            (5, None, []),
+            (3, 2, []),
+        ]:
+            with self.subTest(min_len=min_len, max_len=max_len):
+                substrings = mi.substrings(iter('abcd'), min_len, max_len)
+                actual = [''.join(s) for s in substrings]
+                self.assertEqual(actual, expected)
+
+    def test_lengths_generated(self):
+        # Lengths out of range aren't generated, so they don't take time
+        size = 10 ** 6
+        actual = list(mi.substrings(range(size), min_len=size - 1))
+        self.assertEqual([len(x) for x in actual], [size - 1] * 2 + [size])
+
+    def test_invalid_min_len(self):
+        with self.assertRaises(ValueError):
+            list(mi.substrings('abcd', min_len=0))
+
+    def test_no_copy(self):
+        iterable = iter('abcd')
+        actual = list(mi.substrings(iterable, max_len=3, copy=False))
+        expected = list(mi.substrings('abcd', max_len=3))
+        self.assertEqual(actual, expected)
+        self.assertTrue(all(isinstance(s, mi.SequenceView) for s in actual))
+
 
 class SubstringsIndexesTests(TestCase):
     def test_basic(self):
@@ -872,6 +1104,116 @@ class SubstringsIndexesTests(TestCase):
         ]
         self.assertEqual(actual, expected)
 
+    def test_lengths(self):
+        sequence = 'abcd'
+        actual = list(mi.substrings_indexes(sequence, min_len=2, max_len=3))
+        expected = [
+            ('ab', 0, 2),
+            ('bc', 1, 3),
+            ('cd', 2, 4),
+            ('abc', 0, 3),
+            ('bcd', 1, 4),
+        ]
+        self.assertEqual(actual, expected)
+
+        actual = list(mi.substrings_indexes(sequence, True, 3, None))
+        expected = [('abcd', 0, 4), ('abc', 0, 3), ('bcd', 1, 4)]
+        self.assertEqual(actual, expected)
+
+        with self.assertRaises(ValueError):
+            mi.substrings_indexes(sequence, min_len=0)
+
+    def test_no_copy(self):
+        sequence = 'abcd'
+        actual = list(mi.substrings_indexes(sequence, copy=False))
+        expected = list(mi.substrings_indexes(sequence))
+        self.assertEqual(
+            [(tuple(s), i, j) for s, i, j in actual],
+            [(tuple(s), i, j) for s, i, j in expected],
+        )
+        view, i, j = actual[-1]
+        self.assertIsInstance(view, mi.SequenceView)
+        self.assertEqual(view[1:3], ('b', 'c'))
+
+
+class SubstringsCountTests(TestCase):
+    def test_matches_substrings(self):
+        for length, min_len, max_len in product(
+            range(6), range(1, 7), [None, 0, 1, 2, 3, 4, 5, 6, 7]
+        ):
+            with self.subTest(length=length, min_len=min_len, max_len=max_len):
+                actual = mi.substrings_count(length, min_len, max_len)
+                expected = mi.ilen(
+                    mi.substrings(range(length), min_len, max_len)
+                )
+                self.assertEqual(actual, expected)
+
+    def test_large(self):
+        self.assertEqual(mi.substrings_count(10 ** 6), 500000500000)
+
+    def test_invalid_min_len(self):
+        with self.assertRaises(ValueError):
+            mi.substrings_count(4, min_len=0)
+
+
+class DistinctSubstringsTests(TestCase):
+    def test_basic(self):
+        iterable = 'mississippi'
+        ds = mi.distinct_substrings(iterable)
+        actual = list(ds)
+        expected = list(mi.unique_everseen(mi.substrings(iterable)))
+        self.assertEqual(len(actual), len(expected))
+        self.assertEqual(set(actual), set(expected))
+        self.assertEqual(len(ds), len(expected))
+
+    def test_count(self):
+        iterable = 'mississippi'
+        ds = mi.distinct_substrings(iterable)
+        for substring, expected in [
+            ('i', 4),
+            ('ss', 2),
+            ('issi', 2),  # Overlapping occurrences
+            ('mississippi', 1),
+            ('x', 0),
+            ('sx', 0),
+            ('', 12),
+        ]:
+            with self.subTest(substring=substring):
+                self.assertEqual(ds.count(substring), expected)
+                self.assertEqual(substring in ds, bool(expected))
+
+    def test_random(self):
+        seed(0)
+        for _ in range(100):
+            iterable = [randrange(3) for _ in range(randrange(15))]
+            ds = mi.distinct_substrings(iterable)
+            expected = Counter(
+                tuple(iterable[i:j])
+                for i, j in combinations(range(len(iterable) + 1), 2)
+            )
+            actual = list(ds)
+            self.assertCountEqual(actual, expected)
+            self.assertEqual(len(ds), len(expected))
+            for substring, occurrences in expected.items():
+                self.assertEqual(ds.count(substring), occurrences)
+
+    def test_empty(self):
+        ds = mi.distinct_substrings([])
+        self.assertEqual(list(ds), [])
+        self.assertEqual(len(ds), 0)
+        self.assertEqual(ds.count([1]), 0)
+
+    def test_bytes(self):
+        ds = mi.distinct_substrings(b'abab')
+        self.assertIn((97, 98), ds)
+        self.assertEqual(ds.count(b'ab'), 2)
+
+    def test_hashable_items(self):
+        iterable = [('a', 1), None, ('a', 1), None]
+        ds = mi.distinct_substrings(iterable)
+        self.assertEqual(len(ds), 7)
+        self.assertEqual(ds.count([('a', 1), None]), 2)
+
 
 class BucketTests(TestCase):
     def test_basic(self):
@@ -927,6 +1269,287 @@ class BucketTests(TestCase):
         self.assertEqual(list(D[20]), [])
         self.assertEqual(list(D[30]), [30, 31, 33])
 
+    def test_no_phantom_keys(self):
+        # Looking up missing keys doesn't add them to the cache
+        iterable = [10, 20, 30, 11, 21, 31, 12, 22, 23, 33]
+        D = mi.bucket(iterable, key=lambda x: 10 * (x // 10))
+        for value in range(40, 100):
+            self.assertNotIn(value, D)
+            self.assertEqual(list(D[value]), [])
+        self.assertEqual(len(D._cache), 3)
+        self.assertEqual(set(D), {10, 20, 30})
+
+    def test_buffered_counts(self):
+        iterable = [10, 20, 30, 11, 21, 31, 12, 22, 23, 33]
+        D = mi.bucket(iterable, key=lambda x: 10 * (x // 10))
+        self.assertEqual(D.buffered_counts(), {})
+        self.assertEqual(mi.take(2, D[10]), [10, 11])
+        self.assertEqual(D.buffered_counts(), {20: 1, 30: 1})
+        self.assertEqual(list(D[30]), [30, 31, 33])
+        self.assertEqual(D.buffered_counts(), {20: 4, 10: 1})
+
+    def test_max_buffered_raise(self):
+        iterable = [10, 20, 21, 22, 11, 12]
+        D = mi.bucket(iterable, key=lambda x: 10 * (x // 10), max_buffered=2)
+        it = D[10]
+        self.assertEqual(next(it), 10)
+        self.assertRaises(Full, lambda: next(it))  # No room for 22
+
+        # Once there's room, no items have been lost
+        self.assertEqual(list(D[20]), [20, 21, 22])
+        self.assertEqual(list(D[10]), [11, 12])
+
+    def test_max_buffered_drop(self):
+        # Compare against a simple model that drops the oldest cached item
+        seed(0)
+        iterable = [randrange(10) for _ in range(5000)]
+        max_buffered = 20
+        D = mi.bucket(
+            iterable, lambda x: x, max_buffered=max_buffered, overflow='drop'
+        )
+        source = iter(iterable)
+        model = []  # Cached items, oldest first
+        for _ in range(1000):
+            value = randrange(10)
+            actual = mi.take(3, D[value])
+
+            expected = []
+            while len(expected) < 3:
+                if value in model:
+                    model.remove(value)
+                    expected.append(value)
+                    continue
+                item = next(source, None)
+                if item is None:
+                    break
+                if item == value:
+                    expected.append(item)
+                else:
+                    if len(model) == max_buffered:
+                        del model[0]
+                    model.append(item)
+
+            self.assertEqual(actual, expected)
+            self.assertEqual(D.buffered_counts(), dict(Counter(model)))
+            self.assertLessEqual(len(D._order), 2 * max_buffered + 16)
+
+    def test_max_buffered_zero(self):
+        iterable = [10, 20, 11, 21, 12]
+        key = lambda x: 10 * (x // 10)
+
+        # Nothing can be cached
+        D = mi.bucket(iterable, key, max_buffered=0)
+        it = D[10]
+        self.assertEqual(next(it), 10)
+        self.assertRaises(Full, lambda: next(it))
+        self.assertEqual(mi.take(1, D[20]), [20])
+
+        # Items for other keys are discarded
+        D = mi.bucket(iterable, key, max_buffered=0, overflow='drop')
+        self.assertEqual(list(D[10]), [10, 11, 12])
+        self.assertEqual(D.buffered_counts(), {})
+        self.assertEqual(list(D[20]), [])
+
+    def test_invalid_args(self):
+        key = lambda x: x
+        self.assertRaises(
+            ValueError, lambda: mi.bucket([], key, max_buffered=-1)
+        )
+        self.assertRaises(ValueError, lambda: mi.bucket([], key, overflow='?'))
+        self.assertRaises(
+            ValueError, lambda: mi.bucket([], key, overflow='block')
+        )
+        self.assertRaises(
+            ValueError,
+            lambda: mi.bucket([], key, overflow='raise', concurrent=True),
+        )
+
+    def test_spill(self):
+        # Interleaved reads match plain grouping, and at most max_buffered
+        # items are held in memory
+        seed(0)
+        iterable = [(randrange(50), i) for i in range(3000)]
+        groups = {}
+        for k, i in iterable:
+            groups.setdefault(k, []).append((k, i))
+
+        for shards in (1, 4, 100):
+            with self.subTest(shards=shards):
+                D = mi.bucket(
+                    iterable,
+                    key=itemgetter(0),
+                    max_buffered=10,
+                    overflow='spill',
+                    shards=shards,
+                )
+                remaining = {k: iter(v) for k, v in groups.items()}
+                children = {}
+                while remaining:
+                    k = choice(sorted(remaining))
+                    it = children.setdefault(k, D[k])
+                    actual = mi.take(randrange(1, 20), it)
+                    expected = mi.take(len(actual) or 1, remaining[k])
+                    self.assertEqual(actual, expected)
+                    if not actual:
+                        del remaining[k]
+
+                    in_memory = sum(map(len, D._cache.values()))
+                    self.assertLessEqual(in_memory, 10)
+                D.close()
+
+    def test_spill_counts(self):
+        iterable = [10, 20, 30, 11, 21, 31, 12, 22, 23, 33]
+        key = lambda x: 10 * (x // 10)
+        D = mi.bucket(iterable, key, max_buffered=2, overflow='spill')
+        self.assertEqual(list(D[30]), [30, 31, 33])
+        self.assertEqual(D.buffered_counts(), {10: 3, 20: 4})
+        self.assertIn(20, D)
+        self.assertEqual(list(D[20]), [20, 21, 22, 23])
+        self.assertEqual(list(D[10]), [10, 11, 12])
+        self.assertEqual(D.buffered_counts(), {})
+        self.assertEqual(set(D), {10, 20, 30})
+        D.close()
+
+    def test_spill_zero(self):
+        # Nothing is kept in memory
+        iterable = [10, 20, 30, 11, 21, 31, 12, 22]
+        key = lambda x: 10 * (x // 10)
+        with mi.bucket(iterable, key, max_buffered=0, overflow='spill') as D:
+            self.assertEqual(list(D[30]), [30, 31])
+            self.assertEqual(D._cache, {})
+            self.assertEqual(D.buffered_counts(), {10: 3, 20: 3})
+            self.assertEqual(list(D[10]), [10, 11, 12])
+            self.assertEqual(list(D[20]), [20, 21, 22])
+
+    def test_spill_close(self):
+        key = lambda x: x % 3
+        D = mi.bucket(range(100), key, max_buffered=5, overflow='spill')
+        self.assertEqual(mi.take(4, D[0]), [0, 3, 6, 9])
+        files = list(filter(None, D._shard_files))
+        self.assertTrue(files)
+        D.close()
+        self.assertTrue(all(f.closed for f in files))
+
+    def test_spill_invalid(self):
+        key = lambda x: x
+        self.assertRaises(
+            ValueError, lambda: mi.bucket([], key, overflow='spill', shards=0)
+        )
+        self.assertRaises(
+            ValueError,
+            lambda: mi.bucket([], key, overflow='spill', concurrent=True),
+        )
+
+    def _consume_in_threads(self, func, keys):
+        results = {k: [] for k in keys}
+        threads = [
+            Thread(target=results[k].extend, args=(func(k),)) for k in keys
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_concurrent(self):
+        calls = []
+
+        def key(x):
+            calls.append(current_thread())
+            return x % 4
+
+        D = mi.bucket(range(1000), key, concurrent=True)
+        results = self._consume_in_threads(D.__getitem__, range(4))
+        self.assertEqual(
+            results, {k: list(range(k, 1000, 4)) for k in range(4)}
+        )
+
+        # The key function is called once per item, by the reader thread
+        self.assertEqual(len(calls), 1000)
+        self.assertEqual(len(set(calls)), 1)
+        self.assertNotEqual(calls[0], current_thread())
+
+        self.assertEqual(set(D), {0, 1, 2, 3})
+        self.assertEqual(D.buffered_counts(), {})
+
+    def test_concurrent_block(self):
+        # The reader waits for room rather than exceeding max_buffered
+        D = mi.bucket(
+            range(300), lambda x: x % 3, max_buffered=5, concurrent=True
+        )
+        buffered = []
+
+        def consume(k):
+            for item in D[k]:
+                buffered.append(sum(D.buffered_counts().values()))
+                yield item
+
+        results = self._consume_in_threads(consume, range(3))
+        self.assertEqual(
+            results, {k: list(range(k, 300, 3)) for k in range(3)}
+        )
+        self.assertLessEqual(max(buffered), 5)
+
+    def test_concurrent_hand_off(self):
+        # With no room in the cache, items are passed straight to the child
+        # iterables waiting for them
+        D = mi.bucket(
+            range(300), lambda x: x % 3, max_buffered=0, concurrent=True
+        )
+        results = self._consume_in_threads(D.__getitem__, range(3))
+        self.assertEqual(
+            results, {k: list(range(k, 300, 3)) for k in range(3)}
+        )
+
+    def test_concurrent_waiting_key(self):
+        # The cache is full of 'b' items, but 'a' items can be handed over
+        iterable = ['b1', 'b2', 'a1', 'a2', 'a3']
+        with mi.bucket(
+            iterable, itemgetter(0), max_buffered=2, concurrent=True
+        ) as D:
+            self.assertEqual(list(D['a']), ['a1', 'a2', 'a3'])
+            self.assertEqual(D.buffered_counts(), {'b': 2})
+
+    def test_concurrent_close(self):
+        key = lambda x: x % 2
+        D = mi.bucket(count(), key, max_buffered=2, concurrent=True)
+        self.assertEqual(mi.take(3, D[0]), [0, 2, 4])
+        D.close()
+        D._reader.join(1)
+        self.assertFalse(D._reader.is_alive())
+
+        # Waiting child iterables stop too
+        D = mi.bucket(count(), key, max_buffered=0, concurrent=True)
+        results = []
+        consumer = Thread(target=results.extend, args=(D[0],))
+        consumer.start()
+        consumer.join(0.05)
+        self.assertTrue(consumer.is_alive())
+        D.close()
+        consumer.join(1)
+        self.assertFalse(consumer.is_alive())
+        D._reader.join(1)
+        self.assertFalse(D._reader.is_alive())
+
+    def test_concurrent_contains(self):
+        D = mi.bucket([10, 20, 11], lambda x: 10 * (x // 10), concurrent=True)
+        self.assertIn(20, D)
+        self.assertNotIn(30, D)
+        self.assertEqual(list(D[10]), [10, 11])
+        self.assertNotIn(10, D)
+
+    def test_concurrent_error(self):
+        def gen():
+            yield 1
+            yield 2
+            raise RuntimeError('boom')
+
+        D = mi.bucket(gen(), lambda x: x % 2, concurrent=True)
+        it = D[1]
+        self.assertEqual(next(it), 1)
+        self.assertRaises(RuntimeError, lambda: next(it))
+        self.assertRaises(RuntimeError, lambda: list(D))
+
 
 class SpyTests(TestCase):
     """Tests for ``spy()``"""
@@ -1117,6 +1740,75 @@ class SideEffectTests(TestCase):
         # before function
         self.assertTrue(f.closed)
 
+    def test_background(self):
+        main_thread = current_thread()
+        calls = []
+
+        def func(chunk):
+            calls.append((current_thread() is main_thread, list(chunk)))
+
+        result = list(mi.side_effect(func, range(7), 3, max_pending=2))
+        self.assertEqual(result, list(range(7)))
+
+        # The calls happened in order, in a different thread
+        self.assertEqual(
+            calls, [(False, [0, 1, 2]), (False, [3, 4, 5]), (False, [6])]
+        )
+
+    def test_background_backpressure(self):
+        released = Event()
+
+        def func(chunk):
+            released.wait()
+
+        it = mi.side_effect(func, range(100), 2, max_pending=3)
+
+        # Three chunks may be pending at once, so the items of the first
+        # three chunks can be read...
+        self.assertEqual(mi.take(6, it), [0, 1, 2, 3, 4, 5])
+
+        # ...but the fourth chunk has to wait for the first to be handled
+        consumed = []
+        consumer = Thread(target=lambda: consumed.extend(mi.take(1, it)))
+        consumer.start()
+        consumer.join(0.05)
+        self.assertTrue(consumer.is_alive())
+        self.assertEqual(consumed, [])
+
+        released.set()
+        consumer.join()
+        self.assertEqual(consumed, [6])
+
+    def test_background_error(self):
+        def func(chunk):
+            if 4 in chunk:
+                raise RuntimeError('kaboom')
+
+        it = mi.side_effect(func, range(10), 2, max_pending=2)
+        with self.assertRaisesRegex(RuntimeError, 'kaboom'):
+            mi.consume(it)
+
+    def test_background_after(self):
+        events = []
+
+        def func(chunk):
+            sleep(0.01)
+            events.append(chunk)
+
+        after = lambda: events.append('after')
+        it = mi.side_effect(func, range(4), 2, after=after, max_pending=5)
+        self.assertEqual(list(it), [0, 1, 2, 3])
+        self.assertEqual(events, [[0, 1], [2, 3], 'after'])
+
+    def test_background_invalid(self):
+        for kwargs in [
+            {'max_pending': 1},  # No chunk_size
+            {'chunk_size': 2, 'max_pending': 0},
+        ]:
+            with self.subTest(kwargs=kwargs):
+                with self.assertRaises(ValueError):
+                    list(mi.side_effect(print, range(10), **kwargs))
+
 
 class SlicedTests(TestCase):
     """Tests for ``sliced()``"""
@@ -1163,6 +1855,36 @@ class SlicedTests(TestCase):
         expected = [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
         self.assertEqual(actual, expected)
 
+    def test_no_copy(self):
+        for seq in [b'ABCDEFG', bytearray(b'ABCDEFG'), array('b', b'ABCDEFG')]:
+            with self.subTest(seq=seq):
+                actual = list(mi.sliced(seq, 3, copy=False))
+                self.assertTrue(all(isinstance(s, memoryview) for s in actual))
+                self.assertEqual(
+                    [s.tobytes() for s in actual], [b'ABC', b'DEF', b'G']
+                )
+
+    def test_no_copy_items(self):
+        # Slices of typed arrays contain whole items, not bytes
+        seq = array('i', range(5))
+        actual = [s.tolist() for s in mi.sliced(seq, 2, copy=False)]
+        self.assertEqual(actual, [[0, 1], [2, 3], [4]])
+
+    def test_no_copy_shares_memory(self):
+        seq = bytearray(b'ABCDEF')
+        first, second = mi.sliced(seq, 3, copy=False)
+        seq[3:] = b'def'
+        self.assertEqual(second.tobytes(), b'def')
+
+    def test_no_copy_strict(self):
+        with self.assertRaises(ValueError):
+            list(mi.sliced(b'ABCDEFG', 3, strict=True, copy=False))
+
+    def test_no_copy_not_buffer(self):
+        seq = 'ABCDEFG'
+        actual = list(mi.sliced(seq, 3, copy=False))
+        self.assertEqual(actual, ['ABC', 'DEF', 'G'])
+
 
 class SplitAtTests(TestCase):
     def test_basic(self):
@@ -1695,17 +2417,99 @@ class DistributeTest(TestCase):
             (3, [[1, 4, 7, 10], [2, 5, 8], [3, 6, 9]]),
             (10, [[n] for n in range(1, 10 + 1)]),
         ]:
-            self.assertEqual(
-                [list(x) for x in mi.distribute(n, iterable)], expected
-            )
+            # Sequences are read by index, other iterables through tee
+            for source in (iterable, iter(iterable)):
+                with self.subTest(n=n, source=type(source)):
+                    self.assertEqual(
+                        [list(x) for x in mi.distribute(n, source)], expected
+                    )
 
     def test_large_n(self):
         iterable = [1, 2, 3, 4]
+        for source in (iterable, iter(iterable)):
+            with self.subTest(source=type(source)):
+                self.assertEqual(
+                    [list(x) for x in mi.distribute(6, source)],
+                    [[1], [2], [3], [4], [], []],
+                )
+
+    def test_iterator_children(self):
+        # Children of a non-Sequence can be read in any order
+        children = mi.distribute(3, iter(range(10)))
         self.assertEqual(
-            [list(x) for x in mi.distribute(6, iterable)],
-            [[1], [2], [3], [4], [], []],
+            [list(x) for x in reversed(children)],
+            [[2, 5, 8], [1, 4, 7], [0, 3, 6, 9]],
         )
 
+    def test_sequence(self):
+        # Sequences are read by index rather than through tee
+        iterable = range(10)
+        children = mi.distribute(3, iterable)
+        self.assertEqual(
+            [list(x) for x in reversed(children)],
+            [[2, 5, 8], [1, 4, 7], [0, 3, 6, 9]],
+        )
+
+    def test_invalid_max_buffered(self):
+        for max_buffered in (0, -1):
+            with self.subTest(max_buffered=max_buffered):
+                self.assertRaises(
+                    ValueError,
+                    lambda: mi.distribute(2, [], max_buffered),
+                )
+
+    def test_max_buffered(self):
+        for n in (1, 2, 3, 10):
+            with self.subTest(n=n):
+                children = mi.distribute(n, iter(range(10)), max_buffered=1)
+                actual = [list(x) for x in zip(*children)]
+                expected = list(zip(*mi.distribute(n, range(10))))
+                self.assertEqual(actual, [list(x) for x in expected])
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_max_buffered_items_not_compared(self):
+        # Items are returned as they are, without being compared to anything
+        arrays = [numpy.arange(3), numpy.arange(3)]
+        children = mi.distribute(2, iter(arrays), max_buffered=1)
+        actual = [list(x) for x in children]
+        self.assertEqual(len(actual), 2)
+        self.assertIs(actual[0][0], arrays[0])
+        self.assertIs(actual[1][0], arrays[1])
+
+    def test_max_buffered_full(self):
+        children = mi.distribute(
+            2, iter(range(10)), max_buffered=2, block=False
+        )
+        first, second = children
+        self.assertEqual(next(first), 0)
+        self.assertEqual(next(first), 2)
+        self.assertEqual(next(first), 4)
+        # 1 and 3 are waiting to be read from second, so there's no room
+        # for 5.
+        self.assertRaises(Full, lambda: next(first))
+
+        # Once second catches up, first can continue
+        self.assertEqual(list(islice(second, 3)), [1, 3, 5])
+        self.assertEqual(list(first), [6, 8])
+        self.assertEqual(list(second), [7, 9])
+
+    def test_max_buffered_threads(self):
+        # Each child is consumed by its own thread; readers that get ahead
+        # wait for the others rather than buffering the whole input.
+        n = 4
+        children = mi.distribute(n, iter(range(1000)), max_buffered=2)
+        results = [[] for _ in range(n)]
+        threads = [
+            Thread(target=results[i].extend, args=(children[i],))
+            for i in range(n)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, [list(range(i, 1000, n)) for i in range(n)])
+
 
 class StaggerTest(TestCase):
     """Tests for ``stagger()``"""
@@ -1741,6 +2545,27 @@ class StaggerTest(TestCase):
             )
             self.assertEqual(list(all_groups), expected)
 
+    def test_iterator(self):
+        # Iterators are split with tee; sequences are read by index
+        for offsets, longest in product([(-1, 0, 1), (0, 2, 5)], [0, 1]):
+            with self.subTest(offsets=offsets, longest=longest):
+                actual = mi.stagger(
+                    iter(range(6)), offsets=offsets, longest=longest
+                )
+                expected = mi.stagger(
+                    range(6), offsets=offsets, longest=longest
+                )
+                self.assertEqual(list(actual), list(expected))
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_ndarray(self):
+        arr = numpy.arange(6)
+        actual = [
+            tuple(int(x) for x in t)
+            for t in mi.stagger(arr, offsets=(0, 2, 4))
+        ]
+        self.assertEqual(actual, [(0, 2, 4), (1, 3, 5)])
+
 
 class ZipEqualTest(TestCase):
     """Tests for ``zip_equal()``"""
@@ -1820,6 +2645,22 @@ class ZipOffsetTest(TestCase):
         ]
         self.assertEqual(actual, expected)
 
+    def test_large_offset(self):
+        # Offsets past the end of a sequence give nothing to zip
+        for it in ([0, 1, 2], iter([0, 1, 2])):
+            actual = list(mi.zip_offset(it, 'abcd', offsets=(5, 0)))
+            self.assertEqual(actual, [])
+
+    def test_sequence_skip(self):
+        # Positive offsets index into sequences rather than iterating
+        class NoIterList(list):
+            def __iter__(self):
+                raise AssertionError('should not iterate')
+
+        iterables = NoIterList('abcd'), 'xyz'
+        actual = list(mi.zip_offset(*iterables, offsets=(1, 0)))
+        self.assertEqual(actual, [('b', 'x'), ('c', 'y'), ('d', 'z')])
+
     def test_mismatch(self):
         iterables = [0, 1, 2], [2, 3, 4]
         offsets = (-1, 0, 1)
@@ -2297,6 +3138,74 @@ class GroupByTransformTests(TestCase):
         expected = [(0, 55), (10, 155), (20, 255), (30, 355), (40, 455)]
         self.assertEqual(actual, expected)
 
+    def test_executor(self):
+        iterable = [x // 7 for x in range(100)] + [0, 0, 1]
+        keyfunc = lambda k: k % 3
+        valuefunc = lambda v: v + 1
+        expected = list(
+            mi.groupby_transform(iterable, keyfunc, valuefunc, sorted)
+        )
+        with ThreadPoolExecutor(4) as executor:
+            actual = list(
+                mi.groupby_transform(
+                    iterable,
+                    keyfunc,
+                    valuefunc,
+                    sorted,
+                    executor=executor,
+                    max_pending=3,
+                )
+            )
+        self.assertEqual(actual, expected)
+
+    def test_max_pending(self):
+        # Only max_pending groups are in the executor at once
+        submitted = []
+
+        class ImmediateExecutor(Executor):
+            def submit(self, fn, *args):
+                submitted.append(None)
+                future = Future()
+                future.set_result(fn(*args))
+                return future
+
+        grouper = mi.groupby_transform(
+            range(20),
+            lambda x: x // 2,
+            reducefunc=sum,
+            executor=ImmediateExecutor(),
+            max_pending=3,
+        )
+        self.assertEqual(next(grouper), (0, 1))
+        self.assertEqual(len(submitted), 3)
+        self.assertEqual(next(grouper), (1, 5))
+        self.assertEqual(len(submitted), 4)
+        self.assertEqual(len(list(grouper)), 8)
+        self.assertEqual(len(submitted), 10)
+
+    def test_executor_error(self):
+        def reducefunc(g):
+            if g[0] == 5:
+                raise RuntimeError
+            return len(g)
+
+        with ThreadPoolExecutor(2) as executor:
+            grouper = mi.groupby_transform(
+                range(10), reducefunc=reducefunc, executor=executor
+            )
+            actual = list(islice(grouper, 5))
+            self.assertEqual(actual, [(i, 1) for i in range(5)])
+            self.assertRaises(RuntimeError, next, grouper)
+
+    def test_invalid_max_pending(self):
+        with ThreadPoolExecutor(1) as executor:
+            self.assertRaises(
+                ValueError,
+                lambda: mi.groupby_transform(
+                    [1], reducefunc=sum, executor=executor, max_pending=0
+                ),
+            )
+
 
 class NumericRangeTests(TestCase):
     def test_basic(self):
@@ -2999,6 +3908,35 @@ class IsliceExtendedTests(TestCase):
         with self.assertRaises(ValueError):
             list(mi.islice_extended([1, 2, 3], 0, 1, 0))
 
+    def test_pickle(self):
+        it = mi.islice_extended(iter(range(100)))[10:50:3]
+        self.assertEqual(mi.take(2, it), [10, 13])
+        restored = loads(dumps(it))
+        self.assertEqual(list(restored), list(range(16, 50, 3)))
+        self.assertEqual(list(it), list(range(16, 50, 3)))
+
+        for args in [(None,), (5,), (2, None), (3, 40, 7), (0, 10), (50, 10)]:
+            with self.subTest(args=args):
+                expected = list(range(100))[slice(*args)]
+                it = mi.islice_extended(iter(range(100)), *args)
+                for i in range(len(expected) + 2):
+                    restored = loads(dumps(it))
+                    self.assertEqual(list(restored), expected[i:])
+                    next(it, None)
+
+        it = mi.islice_extended(iter(range(5)))
+        next(it)
+        self.assertEqual(list(loads(dumps(it))), [1, 2, 3, 4])
+
+        # Slices of slices pickle their whole chain
+        it = mi.islice_extended(iter(range(100)))[5:][::2][:10]
+        next(it)
+        self.assertEqual(list(loads(dumps(it))), list(range(7, 25, 2)))
+
+        # Negative values need a generator, which can't be pickled
+        it = mi.islice_extended(iter(range(10)), -3)
+        self.assertRaises(TypeError, lambda: dumps(it))
+
     def test_slicing(self):
         iterable = map(str, count())
         first_slice = mi.islice_extended(iterable)[10:]
@@ -3160,16 +4098,249 @@ class SeekableTest(PeekableMixinTests, TestCase):
         self.assertEqual(mi.take(10, s), [str(n) for n in range(10)])
         self.assertEqual(list(s.elements()), ['6', '7', '8', '9'])
 
-        s.seek(0)
+        s.seek(6)
         self.assertEqual(mi.take(14, s), [str(n) for n in range(6, 20)])
         self.assertEqual(list(s.elements()), ['16', '17', '18', '19'])
 
+    def test_maxlen_positions(self):
+        # Positions count from the start of the source, not the cache
+        s = mi.seekable(map(str, count()), maxlen=4)
+        self.assertEqual((s.position, s.earliest_available), (0, 0))
+
+        mi.consume(s, 10)
+        self.assertEqual((s.position, s.earliest_available), (10, 6))
+        s.seek(8)
+        self.assertEqual(s.position, 8)
+        self.assertEqual(s.peek(), '8')
+        self.assertEqual(s.position, 8)
+        self.assertEqual(next(s), '8')
+
+        # Evicted positions can't be seeked to
+        for index in (0, 5, -1):
+            with self.assertRaises(IndexError):
+                s.seek(index)
+        self.assertEqual(next(s), '9')
+
+        # Seeking forward reads ahead and evicts as it goes
+        s.seek(15)
+        self.assertEqual((s.position, s.earliest_available), (15, 11))
+        self.assertEqual(next(s), '15')
+        s.seek(12)
+        self.assertEqual(mi.take(3, s), ['12', '13', '14'])
+
+    def test_seek_key(self):
+        s = mi.seekable(iter([5, 3, 8, 1, 9, 2]))
+        s.seek_key(6)
+        self.assertEqual(next(s), 8)
+        s.seek_key(6)
+        self.assertEqual(next(s), 9)
+        s.seek_key(6)
+        self.assertEqual(list(s), [])
+
+        s.seek(0)
+        s.seek_key('x', key=lambda x: 'abcdefghij'[x])
+        self.assertEqual(list(s), [])
+
+    def test_seek_key_sorted(self):
+        data = [(t, str(t)) for t in range(0, 1000, 10)]
+        key = itemgetter(0)
+        for kwargs in ({}, {'maxlen': 20}, {'hot_size': 5}):
+            with self.subTest(kwargs=kwargs):
+                s = mi.seekable(iter(data), **kwargs)
+                # Not cached yet: scan forward
+                s.seek_key(255, key=key, assume_sorted=True)
+                self.assertEqual(next(s), (260, '260'))
+                # Cached: binary search, possibly backward
+                s.seek_key(200, key=key, assume_sorted=True)
+                expected = max(200, s.earliest_available * 10)
+                self.assertEqual(next(s), (expected, str(expected)))
+                s.seek_key(-1, key=key, assume_sorted=True)
+                self.assertEqual(s.position, s.earliest_available)
+                # Past the end
+                s.seek_key(5000, key=key, assume_sorted=True)
+                self.assertEqual(list(s), [])
+                self.assertEqual(s.position, 100)
+
+    def test_seek_key_sorted_search(self):
+        # Cached items are binary searched rather than scanned
+        calls = []
+
+        def key(x):
+            calls.append(x)
+            return x
+
+        s = mi.seekable(range(1024))
+        mi.consume(s)
+        s.seek_key(700, key=key, assume_sorted=True)
+        self.assertLessEqual(len(calls), 12)
+        self.assertEqual(next(s), 700)
+
+    def test_position(self):
+        s = mi.seekable('abcde')
+        self.assertEqual(s.position, 0)
+        s.seek(3)
+        self.assertEqual(s.position, 3)
+        s.seek(1)
+        self.assertEqual(s.position, 1)
+        mi.consume(s)
+        self.assertEqual((s.position, s.earliest_available), (5, 0))
+
     def test_maxlen_zero(self):
         iterable = [str(x) for x in range(5)]
         s = mi.seekable(iterable, maxlen=0)
         self.assertEqual(list(s), iterable)
         self.assertEqual(list(s.elements()), [])
 
+    def test_hot_size(self):
+        iterable = [str(n) for n in range(100)]
+        for hot_size in (0, 1, 10, 100, 200):
+            with self.subTest(hot_size=hot_size):
+                s = mi.seekable(iterable, hot_size=hot_size)
+                self.assertEqual(list(s), iterable)
+
+                s.seek(0)
+                self.assertEqual(mi.take(10, s), iterable[:10])
+                s.seek(95)
+                self.assertEqual(list(s), iterable[95:])
+                s.seek(50)
+                self.assertEqual(list(s), iterable[50:])
+
+                elements = s.elements()
+                self.assertEqual(len(elements), 100)
+                self.assertEqual(elements[-1], '99')
+                self.assertEqual(elements[3:90:7], iterable[3:90:7])
+                self.assertRaises(IndexError, lambda: elements[100])
+                s.close()
+
+    def test_hot_size_spill(self):
+        # Only the hot items are kept in memory
+        s = mi.seekable(range(1000), hot_size=5)
+        mi.consume(s)
+        self.assertEqual(len(s._cache._hot), 5)
+        s.seek(0)
+        self.assertEqual(list(s), list(range(1000)))
+        s.close()
+
+    def test_close(self):
+        s = mi.seekable(range(10), hot_size=2)
+        mi.consume(s)
+        f = s._cache._file
+        s.close()
+        self.assertTrue(f.closed)
+        s.close()  # Closing again is fine
+
+        # Without hot_size, there's nothing to close
+        s = mi.seekable(range(10))
+        mi.consume(s)
+        s.close()
+        s.seek(0)
+        self.assertEqual(list(s), list(range(10)))
+
+    def test_hot_size_invalid(self):
+        self.assertRaises(
+            ValueError, lambda: mi.seekable([], maxlen=2, hot_size=2)
+        )
+        self.assertRaises(ValueError, lambda: mi.seekable([], hot_size=-1))
+
+    def test_pickle(self):
+        for kwargs in ({}, {'maxlen': 5}, {'hot_size': 3}):
+            with self.subTest(kwargs=kwargs):
+                s = mi.seekable(iter(range(20)), **kwargs)
+                mi.consume(s, 10)
+                s.seek(7)
+
+                restored = loads(dumps(s))
+                self.assertEqual(restored.position, 7)
+                self.assertEqual(
+                    restored.earliest_available, s.earliest_available
+                )
+                self.assertEqual(list(restored.elements()), list(s.elements()))
+                self.assertEqual(list(restored), list(range(7, 20)))
+                self.assertEqual(list(s), list(range(7, 20)))
+                restored.close()
+                s.close()
+
+
+class ReplayableTests(TestCase):
+    def test_cursors(self):
+        r = mi.replayable(iter(range(10)))
+        c_1 = r.cursor()
+        c_2 = r.cursor()
+        self.assertEqual(mi.take(4, c_1), [0, 1, 2, 3])
+        self.assertEqual(mi.take(2, c_2), [0, 1])
+        c_3 = r.cursor()
+        self.assertEqual(c_3.position, 2)
+        self.assertEqual(list(c_1), list(range(4, 10)))
+        self.assertEqual(list(c_3), list(range(2, 10)))
+        self.assertEqual(list(c_2), list(range(2, 10)))
+        self.assertEqual(list(c_2), [])
+        self.assertEqual(list(r), [])
+
+    def test_iter(self):
+        r = mi.replayable('abc')
+        self.assertEqual(list(r), ['a', 'b', 'c'])
+        self.assertEqual(list(r), [])
+        self.assertEqual(list(r.cursor(5)), [])
+        self.assertRaises(IndexError, lambda: r.cursor(1))
+
+    def test_bounded_cache(self):
+        # Only the items between the slowest and fastest cursors are kept
+        r = mi.replayable(count())
+        fast, slow = r.cursor(), r.cursor()
+        for i in range(1000):
+            mi.consume(fast, 3)
+            next(slow)
+            live = len(r._cache) - (r.earliest_available - r._offset)
+            self.assertEqual(r.earliest_available, slow.position)
+            self.assertEqual(live, fast.position - slow.position)
+            self.assertLessEqual(len(r._cache), 2 * live + 3)
+
+    def test_close(self):
+        r = mi.replayable(range(10))
+        c_1, c_2 = r.cursor(), r.cursor()
+        mi.consume(c_1, 5)
+        self.assertEqual(r.earliest_available, 0)
+        c_2.close()
+        self.assertEqual(r.earliest_available, 5)
+        self.assertEqual(next(c_1), 5)
+
+        # Closed cursors are done
+        self.assertEqual(list(c_2), [])
+        self.assertRaises(ValueError, lambda: c_2.seek(5))
+        c_2.close()
+
+    def test_iter_close(self):
+        # Closing an iterator over a replayable closes its cursor
+        r = mi.replayable(range(10))
+        c = r.cursor()
+        it = iter(r)
+        self.assertEqual(mi.take(4, it), [0, 1, 2, 3])
+        it.close()
+        self.assertEqual(next(c), 0)
+        self.assertEqual(r.earliest_available, 1)
+
+    def test_seek(self):
+        r = mi.replayable(range(10))
+        c_1, c_2 = r.cursor(), r.cursor()
+        mi.consume(c_1, 5)
+        c_2.seek(3)
+        self.assertEqual(r.earliest_available, 3)
+        self.assertEqual(next(c_2), 3)
+        c_1.seek(4)
+        self.assertEqual(next(c_1), 4)
+        for position in (0, 3, -1):
+            with self.assertRaises(IndexError):
+                c_1.seek(position)
+            with self.assertRaises(IndexError):
+                r.cursor(position)
+
+        # Seeking ahead reads from the source as needed
+        c_1.seek(8)
+        self.assertEqual(list(c_1), [8, 9])
+        self.assertEqual(list(c_2), list(range(4, 10)))
+        c_1.seek(100)
+        self.assertEqual(list(c_1), [])
+
 
 class SequenceViewTests(TestCase):
     def test_init(self):
@@ -3399,6 +4570,283 @@ class MapReduceTests(TestCase):
         self.assertEqual(d, {False: [0, 0, 0], True: [1, 2, 1]})
         self.assertRaises(KeyError, lambda: d[None].append(1))
 
+    def test_combiner(self):
+        # Built-in combiners match reducing the lists of values
+        seed(0)
+        data = [(randrange(10), randrange(-100, 100)) for _ in range(1000)]
+        keyfunc = itemgetter(0)
+        valuefunc = itemgetter(1)
+        for combiner, reducefunc in [
+            ('sum', sum),
+            ('count', len),
+            ('min', min),
+            ('max', max),
+            ('mean', mean),
+            ('first', itemgetter(0)),
+            ('last', itemgetter(-1)),
+            ((0, add), sum),
+            (((), lambda t, x: t + (x,)), tuple),
+        ]:
+            with self.subTest(combiner=combiner):
+                actual = mi.map_reduce(
+                    data, keyfunc, valuefunc, combiner=combiner
+                )
+                expected = mi.map_reduce(data, keyfunc, valuefunc, reducefunc)
+                self.assertEqual(actual, expected)
+                self.assertRaises(KeyError, lambda: actual[None])
+
+    def test_combiner_identity(self):
+        # first and last return the items themselves; sum doesn't modify them
+        items = [[1], [2], [3]]
+        d = mi.map_reduce(items, len, combiner='first')
+        self.assertIs(d[1], items[0])
+        d = mi.map_reduce(items, len, combiner='last')
+        self.assertIs(d[1], items[2])
+        d = mi.map_reduce(items, len, combiner='sum')
+        self.assertEqual(d, {1: [1, 2, 3]})
+        self.assertEqual(items, [[1], [2], [3]])
+
+    def test_combiner_reducefunc(self):
+        d = mi.map_reduce(
+            'abbccc', str.upper, reducefunc=str, combiner='count'
+        )
+        self.assertEqual(d, {'A': '1', 'B': '2', 'C': '3'})
+
+    def test_combiner_factory(self):
+        def combine(summary, x):
+            summary.append(x)
+            return summary
+
+        def merge(summary_1, summary_2):
+            summary_1.extend(summary_2)
+            return summary_1
+
+        expected = {0: [0, 2, 4, 6], 1: [1, 3, 5]}
+        d = mi.map_reduce(range(7), lambda x: x % 2, combiner=(list, combine))
+        self.assertEqual(d, expected)
+
+        with ThreadPoolExecutor(2) as executor:
+            d = mi.map_reduce(
+                range(7),
+                lambda x: x % 2,
+                combiner=(list, combine, merge),
+                executor=executor,
+                chunk_size=2,
+            )
+        self.assertEqual(d, expected)
+
+        pairs = mi.map_reduce(
+            range(7),
+            lambda x: x % 2,
+            combiner=(list, combine, merge),
+            max_keys=1,
+            chunk_size=2,
+        )
+        self.assertEqual(list(pairs), sorted(expected.items()))
+
+    def test_invalid_combiner(self):
+        for combiner in ('median', (0,), (0, add, add, add)):
+            with self.subTest(combiner=combiner):
+                self.assertRaises(
+                    ValueError,
+                    lambda: mi.map_reduce([], bool, combiner=combiner),
+                )
+
+    def test_executor(self):
+        seed(0)
+        data = [(randrange(10), randrange(-100, 100)) for _ in range(1000)]
+        keyfunc = itemgetter(0)
+        valuefunc = itemgetter(1)
+        with ThreadPoolExecutor(4) as executor:
+            for combiner in [
+                None,
+                'sum',
+                'count',
+                'min',
+                'max',
+                'mean',
+                'first',
+                'last',
+                (0, add, add),
+            ]:
+                with self.subTest(combiner=combiner):
+                    actual = mi.map_reduce(
+                        data,
+                        keyfunc,
+                        valuefunc,
+                        combiner=combiner,
+                        executor=executor,
+                        chunk_size=7,
+                    )
+                    expected = mi.map_reduce(
+                        data, keyfunc, valuefunc, combiner=combiner
+                    )
+                    self.assertEqual(actual, expected)
+                    self.assertRaises(KeyError, lambda: actual[None])
+
+    def test_process_executor(self):
+        data = [(x % 3, x) for x in range(100)]
+        with ProcessPoolExecutor(2) as executor:
+            actual = mi.map_reduce(
+                data,
+                itemgetter(0),
+                itemgetter(1),
+                reducefunc=sorted,
+                executor=executor,
+                chunk_size=10,
+            )
+        expected = {k: list(range(k, 100, 3)) for k in range(3)}
+        self.assertEqual(actual, expected)
+
+    def test_max_pending(self):
+        # Only max_pending chunks are submitted ahead of the merged ones
+        submitted = []
+        merged = []
+
+        class RecordingFuture(Future):
+            def result(self, timeout=None):
+                merged.append(len(submitted))
+                return super().result(timeout)
+
+        class RecordingExecutor(Executor):
+            def submit(self, fn, *args):
+                submitted.append(None)
+                future = RecordingFuture()
+                future.set_result(fn(*args))
+                return future
+
+        actual = mi.map_reduce(
+            range(100),
+            lambda x: x % 2,
+            combiner='count',
+            executor=RecordingExecutor(),
+            chunk_size=10,
+            max_pending=3,
+        )
+        self.assertEqual(actual, {0: 50, 1: 50})
+        self.assertEqual(merged, [3, 4, 5, 6, 7, 8, 9, 10, 10, 10])
+
+    def test_executor_error(self):
+        def keyfunc(x):
+            if x == 50:
+                raise RuntimeError
+            return x % 2
+
+        with ThreadPoolExecutor(2) as executor:
+            with self.assertRaises(RuntimeError):
+                mi.map_reduce(
+                    range(100), keyfunc, executor=executor, chunk_size=10
+                )
+
+    def test_invalid_executor_args(self):
+        with ThreadPoolExecutor(1) as executor:
+            for kwargs in [
+                {'combiner': (0, add)},
+                {'chunk_size': 0},
+                {'max_pending': 0},
+            ]:
+                with self.subTest(kwargs=kwargs):
+                    self.assertRaises(
+                        ValueError,
+                        lambda: mi.map_reduce(
+                            [1], bool, executor=executor, **kwargs
+                        ),
+                    )
+
+    def test_max_keys(self):
+        seed(0)
+        data = [(randrange(50), randrange(-100, 100)) for _ in range(1000)]
+        keyfunc = itemgetter(0)
+        valuefunc = itemgetter(1)
+        for combiner in [
+            None,
+            'sum',
+            'count',
+            'min',
+            'max',
+            'mean',
+            'first',
+            'last',
+            (0, add, add),
+        ]:
+            with self.subTest(combiner=combiner):
+                actual = mi.map_reduce(
+                    data,
+                    keyfunc,
+                    valuefunc,
+                    combiner=combiner,
+                    max_keys=5,
+                    chunk_size=7,
+                )
+                expected = mi.map_reduce(
+                    data, keyfunc, valuefunc, combiner=combiner
+                )
+                self.assertEqual(list(actual), sorted(expected.items()))
+
+    def test_max_keys_reducefunc(self):
+        data = ['a', 'bb', 'cc', 'ddd', 'e', 'fff', 'gg']
+        actual = mi.map_reduce(
+            data, len, str.upper, ''.join, max_keys=1, chunk_size=2
+        )
+        expected = [(1, 'AE'), (2, 'BBCCGG'), (3, 'DDDFFF')]
+        self.assertEqual(list(actual), expected)
+
+    @skipIf(resource is None, 'resource is not available')
+    def test_max_keys_open_files(self):
+        # A thousand runs are spilled, but they're merged as they pile up,
+        # so they fit within a limit of 64 open files.
+        code = (
+            'import more_itertools as mi\n'
+            'pairs = mi.map_reduce(\n'
+            '    range(20000),\n'
+            '    lambda x: x % 1000,\n'
+            '    combiner="count",\n'
+            '    max_keys=10,\n'
+            '    chunk_size=20,\n'
+            ')\n'
+            'print(sum(value == 20 for key, value in pairs))\n'
+        )
+
+        def set_limit():
+            hard = resource.getrlimit(resource.RLIMIT_NOFILE)[1]
+            resource.setrlimit(resource.RLIMIT_NOFILE, (64, hard))
+
+        # Run from the directory that has the package being tested
+        output = check_output(
+            [executable, '-c', code],
+            cwd=dirname(dirname(mi.__file__)),
+            preexec_fn=set_limit,
+        )
+        self.assertEqual(output.strip(), b'1000')
+
+    def test_max_keys_executor(self):
+        data = [(x % 13, x) for x in range(200)]
+        with ThreadPoolExecutor(2) as executor:
+            actual = mi.map_reduce(
+                data,
+                itemgetter(0),
+                itemgetter(1),
+                combiner='last',
+                executor=executor,
+                chunk_size=10,
+                max_keys=4,
+            )
+            actual = list(actual)
+        expected = [(k, max(range(k, 200, 13))) for k in range(13)]
+        self.assertEqual(actual, expected)
+
+    def test_invalid_max_keys_args(self):
+        for kwargs in [
+            {'combiner': (0, add)},
+            {'chunk_size': 0},
+            {'max_keys': 0},
+        ]:
+            kwargs.setdefault('max_keys', 1)
+            with self.subTest(kwargs=kwargs):
+                self.assertRaises(
+                    ValueError, lambda: mi.map_reduce([1], bool, **kwargs)
+                )
+
 
 class RlocateTests(TestCase):
     def test_default_pred(self):
@@ -3736,6 +5184,19 @@ class TimeLimitedTests(TestCase):
         with self.assertRaises(ValueError):
             list(mi.time_limited(-0.1, count()))
 
+    def test_pickle(self):
+        iterable = mi.time_limited(0.1, iter(range(10)))
+        self.assertEqual(next(iterable), 0)
+        sleep(0.2)
+        # The elapsed time is saved with the state
+        restored = loads(dumps(iterable))
+        self.assertEqual(list(restored), [])
+        self.assertTrue(restored.timed_out)
+
+        iterable = mi.time_limited(10, iter(range(10)))
+        self.assertEqual(next(iterable), 0)
+        self.assertEqual(list(loads(dumps(iterable))), list(range(1, 10)))
+
 
 class OnlyTests(TestCase):
     def test_defaults(self):
@@ -3807,6 +5268,39 @@ class IchunkedTests(TestCase):
         self.assertEqual(next(chunk), 0)
         self.assertRaises(RuntimeError, next, it)
 
+    def test_in_order_not_cached(self):
+        read = []
+        iterable = (read.append(x) or x for x in range(12))
+        for i, chunk in enumerate(mi.ichunked(iterable, 4)):
+            for j, item in enumerate(chunk):
+                # Items are read from the source only as they're needed
+                self.assertEqual(item, 4 * i + j)
+                self.assertEqual(read[-1], item)
+            self.assertEqual(len(chunk), 0)
+
+    def test_len(self):
+        it = mi.ichunked(range(10), 4)
+        chunk_1 = next(it)
+        with self.assertRaises(TypeError):
+            len(chunk_1)
+        self.assertTrue(chunk_1)
+
+        # Requesting the next chunk caches the rest of the previous one
+        next(chunk_1)
+        chunk_2 = next(it)
+        self.assertEqual(len(chunk_1), 3)
+
+        # Reading all of a full chunk completes it
+        self.assertEqual(list(chunk_2), [4, 5, 6, 7])
+        self.assertEqual(len(chunk_2), 0)
+
+        # A short chunk is complete when the source is exhausted
+        chunk_3 = next(it)
+        self.assertEqual(list(chunk_3), [8, 9])
+        self.assertEqual(len(chunk_3), 0)
+        self.assertTrue(chunk_3)
+        self.assertEqual(list(it), [])
+
 
 class DistinctCombinationsTests(TestCase):
     def test_basic(self):
@@ -4136,6 +5630,36 @@ class WindowedCompleteTests(TestCase):
         ]
         self.assertEqual(actual, expected)
 
+    def test_no_copy(self):
+        for size, n in product(range(6), range(6)):
+            if n > size:
+                continue
+            with self.subTest(size=size, n=n):
+                actual = list(mi.windowed_complete(range(size), n, copy=False))
+                expected = list(mi.windowed_complete(range(size), n))
+                self.assertEqual(actual, expected)
+
+    def test_no_copy_views(self):
+        windows = mi.windowed_complete('abcdefg', 3, copy=False)
+        beginning, middle, end = mi.nth(windows, 2)
+        self.assertIsInstance(middle, mi.SequenceView)
+
+        self.assertEqual(len(beginning), 2)
+        self.assertEqual(middle[0], 'c')
+        self.assertEqual(middle[-1], 'e')
+        with self.assertRaises(IndexError):
+            middle[3]
+
+        # Slices are views too
+        self.assertEqual(end[::-1], ('g', 'f'))
+        self.assertEqual(end[::-1][1:], ('f',))
+        self.assertIsInstance(end[::-1], mi.SequenceView)
+
+        # Views are like tuples, so they aren't equal to lists
+        self.assertNotEqual(middle, ['c', 'd', 'e'])
+        self.assertNotEqual(middle, ('c', 'd'))
+        self.assertEqual(repr(middle), "_SequenceSlice(('c', 'd', 'e'))")
+
 
 class AllUniqueTests(TestCase):
     def test_basic(self):
@@ -4162,6 +5686,19 @@ class AllUniqueTests(TestCase):
             mi.all_unique([[1, 2], [3, 4], (5, 6), (5, 6)]), False
         )
 
+    def test_unhashable_containers(self):
+        self.assertEqual(mi.all_unique([{'a': [1]}, {'a': (1,)}]), True)
+        self.assertEqual(mi.all_unique([{'a': [1]}, {'a': [1]}]), False)
+        self.assertEqual(mi.all_unique([{1}, frozenset([1])]), False)
+
+    def test_unhashable_subclass(self):
+        class S(set):
+            pass
+
+        self.assertEqual(
+            mi.all_unique([S({1}), S({2}), S({3}), S({1})]), False
+        )
+
     def test_key(self):
         iterable = ['A', 'B', 'C', 'b']
         self.assertEqual(mi.all_unique(iterable, lambda x: x), True)
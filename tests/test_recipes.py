@@ -372,6 +372,70 @@ class UniqueEverseenTests(TestCase):
         u = mi.unique_everseen(iterable, key=lambda x: x)
         self.assertEqual(list(u), ['a', [1, 2, 3]])
 
+    def test_unhashable_containers(self):
+        """ensure containers are told apart like they are by =="""
+        iterable = [
+            [1, [2]],
+            (1, [2]),
+            [1, [2]],
+            {1: [2]},
+            {1: (2,)},
+            {1: [2]},
+            {1, 2},
+            frozenset([1, 2]),
+            (1, [2]),
+        ]
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            actual = list(mi.unique_everseen(iterable))
+        expected = [[1, [2]], (1, [2]), {1: [2]}, {1: (2,)}, {1, 2}]
+        self.assertEqual(actual, expected)
+
+    def test_unhashable_bytearray(self):
+        """ensure bytearrays don't need a linear search"""
+        iterable = [bytearray(b'b'), bytearray(b'a'), bytearray(b'b'), b'a']
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            actual = list(mi.unique_everseen(iterable))
+        self.assertEqual(actual, [bytearray(b'b'), bytearray(b'a')])
+
+    def test_unhashable_cycle(self):
+        """ensure containers that contain themselves can be compared"""
+        a = []
+        a.append(a)
+        b = {}
+        b['b'] = b
+        actual = list(mi.unique_everseen([a, b, a, [1], b, [1]]))
+        self.assertEqual(actual, [a, b, [1]])
+
+    def test_unhashable_subclass(self):
+        """ensure subclasses with their own ordering are compared with =="""
+
+        class S(set):
+            pass
+
+        iterable = [S({1}), S({2}), S({3}), S({1}), {2}, {4}, S({4})]
+        actual = list(mi.unique_everseen(iterable))
+        self.assertEqual(actual, [S({1}), S({2}), S({3}), {4}])
+
+    def test_unhashable_unfreezable(self):
+        """ensure the slow path works without issuing warnings"""
+
+        class Unhashable:
+            __hash__ = None
+
+            def __init__(self, value):
+                self.value = value
+
+            def __eq__(self, other):
+                return self.value == other.value
+
+        iterable = [Unhashable(1), Unhashable(2), Unhashable(1)]
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            actual = list(mi.unique_everseen(iterable))
+        self.assertEqual(actual, iterable[:2])
+
 
 class UniqueJustseenTests(TestCase):
     """Tests for ``unique_justseen()``"""